@@ -3,38 +3,119 @@ Sentiment Analysis Service using VADER
 """
 import re
 import time
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, NamedTuple, List, Tuple, Union
+from dataclasses import dataclass
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 from datetime import datetime
 import uuid
 from app.utils.cache_manager import get_cache_manager
 
 
+# Byte translation table for the ASCII fast path of _calculate_symbol_ratio:
+# maps each byte to 1 if it counts as a symbol or digit, 0 otherwise.
+# Mirrors the regex path ([^\w\s] plus \d) for ASCII input.
+_SYM_TBL = bytes(
+    0 if (chr(i).isalpha() or chr(i) == '_' or chr(i).isspace()) else 1
+    for i in range(256)
+)
+
+
+class Scores(NamedTuple):
+    """
+    VADER polarity scores with attribute access and dict-style reads
+    
+    String keys and ``in`` work on field names, like the dict VADER returns;
+    iteration, len() and integer indexing keep tuple semantics.
+    """
+    compound: float
+    pos: float
+    neu: float
+    neg: float
+    
+    def __getitem__(self, key: Union[str, int, slice]) -> Any:
+        # String keys read score fields only, like the dict VADER returns
+        if isinstance(key, str):
+            if key not in self._fields:
+                raise KeyError(key)
+            return getattr(self, key)
+        return tuple.__getitem__(self, key)
+    
+    def __contains__(self, key: object) -> bool:
+        return key in self._fields
+
+
+# Scores reported when no meaningful analysis could be performed
+_NEUTRAL_SCORES = Scores(compound=0.0, pos=0.0, neu=1.0, neg=0.0)
+
+
+@dataclass(frozen=True)
 class SentimentResult:
     """Result object for sentiment analysis"""
-    def __init__(self, sentiment: str, confidence: float, scores: Dict[str, float], 
-                 fallback_used: bool = False, warning: Optional[str] = None):
-        self.sentiment = sentiment
-        self.confidence = confidence
-        self.scores = scores
-        self.fallback_used = fallback_used
-        self.warning = warning
+    sentiment: str
+    confidence: float
+    scores: Scores
+    fallback_used: bool = False
+    warning: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class TextStats:
+    """Per-text measurements shared by the gating and confidence steps"""
+    n_chars: int            # Length of the original text
+    n_symbols: int          # Symbols and digits in the original text
+    n_processed_chars: int  # Length of the preprocessed text
+    n_words: int            # Whitespace-separated words in the preprocessed text
+    
+    @property
+    def symbol_ratio(self) -> float:
+        """Ratio of symbols/numbers to total original length"""
+        return self.n_symbols / self.n_chars if self.n_chars > 0 else 0.0
+
+
+# Text classes produced by SentimentService._classify_text; each indexes
+# the matching handler in SentimentService._TEXT_HANDLERS
+_TEXT_NORMAL = 0
+_TEXT_TOO_SHORT = 1
+_TEXT_TOO_LONG = 2
+_TEXT_HIGH_SYMBOL = 3
+_TEXT_FEW_WORDS = 4
+
+
+# Shared result for empty or whitespace-only input (results are immutable)
+_EMPTY_TEXT_RESULT = SentimentResult(
+    sentiment='normal',
+    confidence=0.1,
+    scores=_NEUTRAL_SCORES,
+    fallback_used=True,
+    warning="Empty or whitespace-only text provided"
+)
 
 
 class SentimentService:
     """Service for analyzing sentiment in English text using VADER"""
     
-    def __init__(self):
+    # Configuration for special cases
+    MIN_TEXT_LENGTH = 3
+    MAX_TEXT_LENGTH = 5000
+    MIN_WORDS_FOR_RELIABLE_ANALYSIS = 3
+    MAX_SYMBOL_RATIO = 0.7  # Maximum ratio of symbols to text length
+    
+    def __init__(self) -> None:
         self.analyzer = SentimentIntensityAnalyzer()
         self.cache_manager = get_cache_manager()
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        """Drop the process-local cache manager (it holds a lock) when pickling"""
+        state = self.__dict__.copy()
+        del state['cache_manager']
+        return state
+    
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        """Restore state and attach to the cache manager of this process"""
+        self.__dict__.update(state)
+        self.cache_manager = get_cache_manager()
         
-        # Configuration for special cases
-        self.MIN_TEXT_LENGTH = 3
-        self.MAX_TEXT_LENGTH = 5000
-        self.MIN_WORDS_FOR_RELIABLE_ANALYSIS = 3
-        self.MAX_SYMBOL_RATIO = 0.7  # Maximum ratio of symbols to text length
-        
-    def analyze_sentiment(self, text: str, request_state=None) -> SentimentResult:
+    def analyze_sentiment(self, text: Optional[str], request_state: Optional[Any] = None) -> SentimentResult:
         """
         Analyze sentiment of the given text with special case handling
         
@@ -49,17 +130,12 @@ class SentimentService:
         
         # Handle empty or None text
         if not text or not text.strip():
-            return SentimentResult(
-                sentiment='normal',
-                confidence=0.1,
-                scores={'compound': 0.0, 'pos': 0.0, 'neu': 1.0, 'neg': 0.0},
-                fallback_used=True,
-                warning="Empty or whitespace-only text provided"
-            )
+            return _EMPTY_TEXT_RESULT
         
-        # Check cache first
-        cache_key = self.cache_manager.generate_sentiment_key(text)
-        cached_result = self.cache_manager.get(cache_key)
+        # Check cache first (manager is resolved once in __init__)
+        cache_manager = self.cache_manager
+        cache_key = cache_manager.generate_sentiment_key(text)
+        cached_result = cache_manager.get(cache_key)
         if cached_result is not None:
             # Mark cache hit in request state if available
             if request_state:
@@ -70,44 +146,148 @@ class SentimentService:
         if request_state:
             request_state.cache_hit = False
         
-        # Check text length constraints
-        text_length_check = self._check_text_length(text)
-        if text_length_check:
-            # Cache the result before returning
-            self.cache_manager.set(cache_key, text_length_check)
-            return text_length_check
+        result = self._analyze_uncached(text)
+        
+        # Cache the result
+        cache_manager.set(cache_key, result)
+        
+        return result
+    
+    def analyze_sentiment_batch(self, texts: List[str]) -> List[SentimentResult]:
+        """
+        Analyze sentiment of several texts with one batched cache round-trip
+        
+        Args:
+            texts: Input texts to analyze
+            
+        Returns:
+            List of SentimentResult aligned with texts
+        """
+        results: List[Optional[SentimentResult]] = [None] * len(texts)
+        
+        # Empty texts never reach the cache, same as analyze_sentiment
+        pending = []
+        for i, text in enumerate(texts):
+            if not text or not text.strip():
+                results[i] = _EMPTY_TEXT_RESULT
+            else:
+                pending.append(i)
+        
+        if not pending:
+            return results
+        
+        cache_manager = self.cache_manager
+        keys = cache_manager.generate_sentiment_keys([texts[i] for i in pending])
+        cached_results = cache_manager.get_many(keys)
+        
+        to_store = {}
+        for i, cache_key, cached_result in zip(pending, keys, cached_results):
+            if cached_result is None:
+                cached_result = self._analyze_uncached(texts[i])
+                to_store[cache_key] = cached_result
+            results[i] = cached_result
+        
+        if to_store:
+            cache_manager.set_many(to_store)
+        
+        return results
+    
+    def _analyze_uncached(self, text: str) -> SentimentResult:
+        """
+        Run the full analysis pipeline on non-empty text, bypassing the cache
+        
+        The text is classified once into a _TEXT_* code and handed to the
+        matching handler, instead of walking the special-case checks in turn.
         
-        # Preprocess the text
+        Args:
+            text: Non-empty input text
+            
+        Returns:
+            SentimentResult with sentiment classification and confidence
+        """
+        code, processed_text, stats = self._classify_text(text)
+        return self._TEXT_HANDLERS[code](self, text, processed_text, stats)
+    
+    def _classify_text(self, text: str) -> Tuple[int, str, Optional[TextStats]]:
+        """
+        Classify non-empty text into one of the _TEXT_* codes
+        
+        Args:
+            text: Non-empty input text
+            
+        Returns:
+            Tuple of (code, processed_text, stats); processed_text and stats
+            are only populated once the text passes the length checks
+        """
+        code = self._length_class(text)
+        if code != _TEXT_NORMAL:
+            return code, "", None
+        
+        # Preprocess the text and measure it once for all downstream checks
         processed_text = self._preprocess_text(text)
+        stats = self._compute_stats(text, processed_text)
         
-        # Check for special cases that might affect analysis
-        special_case_result = self._handle_special_cases(text, processed_text)
-        if special_case_result:
-            # Cache the result before returning
-            self.cache_manager.set(cache_key, special_case_result)
-            return special_case_result
+        if stats.symbol_ratio > self.MAX_SYMBOL_RATIO:
+            code = _TEXT_HIGH_SYMBOL
+        elif stats.n_words < self.MIN_WORDS_FOR_RELIABLE_ANALYSIS:
+            code = _TEXT_FEW_WORDS
         
-        # Get VADER scores
-        scores = self.analyzer.polarity_scores(processed_text)
+        return code, processed_text, stats
+    
+    def _length_class(self, text: str) -> int:
+        """
+        Classify text by length only
         
-        # Determine sentiment classification
-        sentiment = self._classify_sentiment(scores)
+        Args:
+            text: Input text to check
+            
+        Returns:
+            _TEXT_TOO_SHORT, _TEXT_TOO_LONG or _TEXT_NORMAL
+        """
+        # Fast path: raw length already in bounds and nothing to strip
+        text_length = len(text)
+        if (self.MIN_TEXT_LENGTH <= text_length <= self.MAX_TEXT_LENGTH
+                and not text[0].isspace() and not text[-1].isspace()):
+            return _TEXT_NORMAL
         
-        # Calculate confidence with special case adjustments
-        confidence = self._calculate_confidence(scores, text, processed_text)
+        text_length = len(text.strip())
+        if text_length < self.MIN_TEXT_LENGTH:
+            return _TEXT_TOO_SHORT
+        if text_length > self.MAX_TEXT_LENGTH:
+            return _TEXT_TOO_LONG
+        return _TEXT_NORMAL
+    
+    def _compute_stats(self, original_text: str, processed_text: str) -> TextStats:
+        """
+        Measure original and preprocessed text in a single place
         
-        result = SentimentResult(
-            sentiment=sentiment,
-            confidence=confidence,
-            scores=scores
+        Args:
+            original_text: Original input text
+            processed_text: Preprocessed text
+            
+        Returns:
+            TextStats for the pair
+        """
+        return TextStats(
+            n_chars=len(original_text),
+            n_symbols=self._count_symbols(original_text),
+            n_processed_chars=len(processed_text),
+            n_words=len(processed_text.split())
         )
+    
+    def _polarity_scores(self, text: str) -> Scores:
+        """
+        Run VADER on the text and pack the result into Scores
         
-        # Cache the result
-        self.cache_manager.set(cache_key, result)
-        
-        return result
+        Args:
+            text: Text to score
+            
+        Returns:
+            Scores with compound, pos, neu and neg fields
+        """
+        return Scores(**self.analyzer.polarity_scores(text))
     
-    def _preprocess_text(self, text: str) -> str:
+    def _preprocess_text(self, text: Optional[str]) -> str:
         """
         Preprocess text for sentiment analysis
         
@@ -141,93 +321,137 @@ class SentimentService:
         Returns:
             SentimentResult if text is too short/long, None otherwise
         """
-        text_length = len(text.strip())
-        
-        # Handle very short text
-        if text_length < self.MIN_TEXT_LENGTH:
-            return SentimentResult(
-                sentiment='normal',
-                confidence=0.1,
-                scores={'compound': 0.0, 'pos': 0.0, 'neu': 1.0, 'neg': 0.0},
-                fallback_used=True,
-                warning=f"Text too short ({text_length} chars). Minimum {self.MIN_TEXT_LENGTH} characters required for reliable analysis."
-            )
-        
-        # Handle very long text
-        if text_length > self.MAX_TEXT_LENGTH:
-            # Truncate text but continue with analysis
-            truncated_text = text[:self.MAX_TEXT_LENGTH]
-            processed_text = self._preprocess_text(truncated_text)
-            scores = self.analyzer.polarity_scores(processed_text)
-            sentiment = self._classify_sentiment(scores)
-            confidence = self._calculate_confidence(scores, truncated_text, processed_text)
-            
-            return SentimentResult(
-                sentiment=sentiment,
-                confidence=max(0.1, confidence - 0.2),  # Reduce confidence for truncated text
-                scores=scores,
-                fallback_used=True,
-                warning=f"Text truncated from {text_length} to {self.MAX_TEXT_LENGTH} characters for analysis."
-            )
-        
-        return None
+        code = self._length_class(text)
+        if code == _TEXT_NORMAL:
+            return None
+        return self._TEXT_HANDLERS[code](self, text, "", None)
     
-    def _handle_special_cases(self, original_text: str, processed_text: str) -> Optional[SentimentResult]:
+    def _handle_special_cases(self, original_text: str, processed_text: str,
+                              stats: Optional[TextStats] = None) -> Optional[SentimentResult]:
         """
         Handle special cases that might affect sentiment analysis
         
         Args:
             original_text: Original input text
             processed_text: Preprocessed text
+            stats: Precomputed TextStats for the pair (computed if omitted)
             
         Returns:
             SentimentResult if special handling is needed, None otherwise
         """
-        # Check for high symbol/number ratio
-        symbol_ratio = self._calculate_symbol_ratio(original_text)
-        if symbol_ratio > self.MAX_SYMBOL_RATIO:
-            # Try to extract meaningful text
-            meaningful_text = re.sub(r'[^\w\s.,!?;:\'"()-]', ' ', original_text)
-            meaningful_text = re.sub(r'\s+', ' ', meaningful_text.strip())
-            
-            if len(meaningful_text.split()) < 2:
-                return SentimentResult(
-                    sentiment='normal',
-                    confidence=0.1,
-                    scores={'compound': 0.0, 'pos': 0.0, 'neu': 1.0, 'neg': 0.0},
-                    fallback_used=True,
-                    warning=f"Text contains too many symbols ({symbol_ratio:.1%}). Unable to extract meaningful content."
-                )
-            
-            # Analyze the cleaned text with reduced confidence
-            scores = self.analyzer.polarity_scores(meaningful_text)
-            sentiment = self._classify_sentiment(scores)
-            confidence = self._calculate_confidence(scores, meaningful_text, meaningful_text)
-            
-            return SentimentResult(
-                sentiment=sentiment,
-                confidence=max(0.1, confidence - 0.3),  # Significantly reduce confidence
-                scores=scores,
-                fallback_used=True,
-                warning=f"High symbol ratio ({symbol_ratio:.1%}) detected. Analysis based on extracted text."
-            )
+        if stats is None:
+            stats = self._compute_stats(original_text, processed_text)
         
-        # Check for very few words
-        word_count = len(processed_text.split())
-        if word_count < self.MIN_WORDS_FOR_RELIABLE_ANALYSIS:
-            scores = self.analyzer.polarity_scores(processed_text)
-            sentiment = self._classify_sentiment(scores)
-            confidence = self._calculate_confidence(scores, original_text, processed_text)
-            
+        if stats.symbol_ratio > self.MAX_SYMBOL_RATIO:
+            return self._handle_high_symbol(original_text, processed_text, stats)
+        if stats.n_words < self.MIN_WORDS_FOR_RELIABLE_ANALYSIS:
+            return self._handle_few_words(original_text, processed_text, stats)
+        return None
+    
+    def _handle_normal(self, text: str, processed_text: str, stats: TextStats) -> SentimentResult:
+        """Analyze text that passed every special-case check"""
+        # Get VADER scores
+        scores = self._polarity_scores(processed_text)
+        
+        # Determine sentiment classification
+        sentiment = self._classify_sentiment(scores)
+        
+        # Calculate confidence with special case adjustments
+        confidence = self._calculate_confidence(scores, text, processed_text, stats)
+        
+        return SentimentResult(
+            sentiment=sentiment,
+            confidence=confidence,
+            scores=scores
+        )
+    
+    def _handle_too_short(self, text: str, processed_text: str = "",
+                          stats: Optional[TextStats] = None) -> SentimentResult:
+        """Return the fallback result for text below MIN_TEXT_LENGTH"""
+        text_length = len(text.strip())
+        return SentimentResult(
+            sentiment='normal',
+            confidence=0.1,
+            scores=_NEUTRAL_SCORES,
+            fallback_used=True,
+            warning=f"Text too short ({text_length} chars). Minimum {self.MIN_TEXT_LENGTH} characters required for reliable analysis."
+        )
+    
+    def _handle_too_long(self, text: str, processed_text: str = "",
+                         stats: Optional[TextStats] = None) -> SentimentResult:
+        """Analyze the first MAX_TEXT_LENGTH characters of over-long text"""
+        text_length = len(text.strip())
+        
+        # Truncate text but continue with analysis
+        truncated_text = text[:self.MAX_TEXT_LENGTH]
+        processed_text = self._preprocess_text(truncated_text)
+        scores = self._polarity_scores(processed_text)
+        sentiment = self._classify_sentiment(scores)
+        confidence = self._calculate_confidence(scores, truncated_text, processed_text)
+        
+        return SentimentResult(
+            sentiment=sentiment,
+            confidence=max(0.1, confidence - 0.2),  # Reduce confidence for truncated text
+            scores=scores,
+            fallback_used=True,
+            warning=f"Text truncated from {text_length} to {self.MAX_TEXT_LENGTH} characters for analysis."
+        )
+    
+    def _handle_high_symbol(self, original_text: str, processed_text: str,
+                            stats: TextStats) -> SentimentResult:
+        """Analyze only the meaningful part of symbol-heavy text"""
+        symbol_ratio = stats.symbol_ratio
+        
+        # Try to extract meaningful text
+        meaningful_text = re.sub(r'[^\w\s.,!?;:\'"()-]', ' ', original_text)
+        meaningful_text = re.sub(r'\s+', ' ', meaningful_text.strip())
+        
+        if len(meaningful_text.split()) < 2:
             return SentimentResult(
-                sentiment=sentiment,
-                confidence=max(0.1, confidence - 0.2),  # Reduce confidence for short texts
-                scores=scores,
+                sentiment='normal',
+                confidence=0.1,
+                scores=_NEUTRAL_SCORES,
                 fallback_used=True,
-                warning=f"Very short text ({word_count} words). Analysis may be less reliable."
+                warning=f"Text contains too many symbols ({symbol_ratio:.1%}). Unable to extract meaningful content."
             )
         
-        return None
+        # Analyze the cleaned text with reduced confidence
+        scores = self._polarity_scores(meaningful_text)
+        sentiment = self._classify_sentiment(scores)
+        confidence = self._calculate_confidence(scores, meaningful_text, meaningful_text)
+        
+        return SentimentResult(
+            sentiment=sentiment,
+            confidence=max(0.1, confidence - 0.3),  # Significantly reduce confidence
+            scores=scores,
+            fallback_used=True,
+            warning=f"High symbol ratio ({symbol_ratio:.1%}) detected. Analysis based on extracted text."
+        )
+    
+    def _handle_few_words(self, original_text: str, processed_text: str,
+                          stats: TextStats) -> SentimentResult:
+        """Analyze text with fewer than MIN_WORDS_FOR_RELIABLE_ANALYSIS words"""
+        word_count = stats.n_words
+        scores = self._polarity_scores(processed_text)
+        sentiment = self._classify_sentiment(scores)
+        confidence = self._calculate_confidence(scores, original_text, processed_text, stats)
+        
+        return SentimentResult(
+            sentiment=sentiment,
+            confidence=max(0.1, confidence - 0.2),  # Reduce confidence for short texts
+            scores=scores,
+            fallback_used=True,
+            warning=f"Very short text ({word_count} words). Analysis may be less reliable."
+        )
+    
+    # Handlers indexed by the _TEXT_* codes from _classify_text
+    _TEXT_HANDLERS = (
+        _handle_normal,
+        _handle_too_short,
+        _handle_too_long,
+        _handle_high_symbol,
+        _handle_few_words,
+    )
     
     def _calculate_symbol_ratio(self, text: str) -> float:
         """
@@ -242,54 +466,69 @@ class SentimentService:
         if not text:
             return 0.0
         
+        return self._count_symbols(text) / len(text)
+    
+    def _count_symbols(self, text: str) -> int:
+        """
+        Count symbols and numbers in the text
+        
+        Args:
+            text: Input text
+            
+        Returns:
+            Number of non-word, non-whitespace characters plus digits
+        """
+        # ASCII fast path: classify every byte with a single C-level translate
+        try:
+            encoded = text.encode('ascii')
+        except UnicodeEncodeError:
+            pass
+        else:
+            return encoded.translate(_SYM_TBL).count(1)
+        
         # Count non-alphabetic, non-whitespace characters
         symbol_count = len(re.findall(r'[^\w\s]', text))
         number_count = len(re.findall(r'\d', text))
-        total_symbols = symbol_count + number_count
-        
-        return total_symbols / len(text) if len(text) > 0 else 0.0
+        return symbol_count + number_count
     
-    def _classify_sentiment(self, scores: Dict[str, float]) -> str:
+    def _classify_sentiment(self, scores: Scores) -> str:
         """
         Classify sentiment based on VADER compound score
         
         Args:
-            scores: VADER polarity scores dictionary
+            scores: VADER polarity scores
             
         Returns:
             Sentiment classification: 'positive', 'negative', or 'normal'
         """
-        compound = scores['compound']
+        compound = scores.compound
         
-        # VADER compound score thresholds
-        if compound >= 0.05:
-            return 'positive'
-        elif compound <= -0.05:
-            return 'negative'
-        else:
-            return 'normal'
+        # Standard VADER compound score thresholds (+/-0.05)
+        return 'positive' if compound >= 0.05 else ('negative' if compound <= -0.05 else 'normal')
     
-    def _calculate_confidence(self, scores: Dict[str, float], 
-                             original_text: str = "", processed_text: str = "") -> float:
+    def _calculate_confidence(self, scores: Scores, 
+                             original_text: str = "", processed_text: str = "",
+                             stats: Optional[TextStats] = None) -> float:
         """
         Calculate confidence score based on VADER scores and text characteristics
         
         Args:
-            scores: VADER polarity scores dictionary
+            scores: VADER polarity scores
             original_text: Original input text (for additional analysis)
             processed_text: Preprocessed text (for additional analysis)
+            stats: Precomputed TextStats for the pair (computed if omitted)
             
         Returns:
             Confidence score between 0.0 and 1.0
         """
-        compound = abs(scores['compound'])
+        compound = abs(scores.compound)
         
         # Base confidence on absolute compound score
         # VADER compound ranges from -1 to 1, so abs gives us 0 to 1
         base_confidence = compound
         
         # Adjust confidence based on the distribution of pos/neg/neu scores
-        pos, neg, neu = scores['pos'], scores['neg'], scores['neu']
+        pos, neg, neu = scores.pos, scores.neg, scores.neu
         
         # If one sentiment dominates, increase confidence
         max_sentiment = max(pos, neg, neu)
@@ -299,16 +538,19 @@ class SentimentService:
             base_confidence = max(0.1, base_confidence - 0.1)
         
         # Additional adjustments based on text characteristics
-        if original_text and processed_text:
+        if stats is None and original_text and processed_text:
+            stats = self._compute_stats(original_text, processed_text)
+        
+        if stats is not None:
             # Reduce confidence for very short texts
-            word_count = len(processed_text.split())
+            word_count = stats.n_words
             if word_count < 3:
                 base_confidence = max(0.1, base_confidence - 0.2)
             elif word_count < 5:
                 base_confidence = max(0.1, base_confidence - 0.1)
             
             # Reduce confidence if there's a big difference between original and processed
-            length_ratio = len(processed_text) / len(original_text) if len(original_text) > 0 else 1.0
+            length_ratio = stats.n_processed_chars / stats.n_chars if stats.n_chars > 0 else 1.0
             if length_ratio < 0.5:  # Significant text was removed during preprocessing
                 base_confidence = max(0.1, base_confidence - 0.15)
         
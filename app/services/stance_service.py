@@ -1,72 +1,119 @@
 """
 Stance Analysis Service for detecting stance towards specific targets
 """
-import re
 import time
-from typing import Dict, Any, Optional, List, Tuple
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Any, Optional, List, Sequence, Tuple
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 from datetime import datetime
 import uuid
 from app.utils.cache_manager import get_cache_manager
 
 
+@lru_cache(maxsize=512)
+def _collapse_whitespace(text: str) -> str:
+    """Strip text and collapse internal whitespace runs to single spaces"""
+    # str.split() with no separator splits on the same Unicode whitespace
+    # as r'\s+' and drops leading/trailing runs, without regex overhead
+    return ' '.join(text.split())
+
+
+@lru_cache(maxsize=256)
+def _tokenize_cached(text: str) -> Tuple[str, ...]:
+    """Whitespace tokens of text as an immutable (cacheable) tuple"""
+    return tuple(text.split())
+
+
+# Punctuation stripped from context words before lexicon lookups
+_WORD_PUNCT = '.,!?;:"()[]{}'
+
+# Keywords that might indicate stance
+_POSITIVE_INDICATORS = (
+    'love', 'like', 'great', 'excellent', 'amazing', 'wonderful', 'fantastic',
+    'good', 'best', 'awesome', 'perfect', 'brilliant', 'outstanding', 'superb',
+    'support', 'endorse', 'recommend', 'praise', 'admire', 'appreciate',
+    'trust', 'respect', 'favor', 'champion', 'defend', 'celebrate', 'embrace'
+)
+
+_NEGATIVE_INDICATORS = (
+    'hate', 'dislike', 'terrible', 'awful', 'horrible', 'bad', 'worst',
+    'disgusting', 'pathetic', 'useless', 'garbage', 'trash', 'sucks',
+    'oppose', 'against', 'criticize', 'condemn', 'reject', 'disapprove',
+    'distrust', 'despise', 'attack', 'blame', 'fault', 'boycott', 'avoid',
+    'overpriced', 'worthless', 'disappointing', 'frustrated'
+)
+
+# Modifiers that can change stance intensity
+_INTENSIFIERS = ('very', 'extremely', 'really', 'totally', 'completely', 'absolutely')
+_DIMINISHERS = ('somewhat', 'slightly', 'kind of', 'sort of', 'a bit', 'rather')
+
+# Negation words that can flip stance
+_NEGATION_WORDS = ('not', 'no', 'never', 'nothing', 'nobody', 'nowhere',
+                   'neither', 'nor', 'none', "don't", "doesn't", "didn't",
+                   "won't", "wouldn't", "can't", "couldn't", "shouldn't")
+
+# Lookup tables derived from the lexicons above, built once at import so
+# scoring costs one hash probe per word (positive wins if a word is in both
+# lists, intensifier wins over diminisher, matching the original checks)
+_INDICATOR_POLARITY: Dict[str, float] = {word: -1.0 for word in _NEGATIVE_INDICATORS}
+_INDICATOR_POLARITY.update((word, 1.0) for word in _POSITIVE_INDICATORS)
+_MODIFIER_FACTORS: Dict[str, float] = {word: 0.7 for word in _DIMINISHERS}
+_MODIFIER_FACTORS.update((word, 1.5) for word in _INTENSIFIERS)
+_NEGATION_SET = frozenset(_NEGATION_WORDS)
+
+# Combined-score multiplier indexed by whether both stance signals agree
+_AGREEMENT_BOOST = (1.0, 1.2)
+
+
+@dataclass(frozen=True)
 class StanceResult:
     """Result object for stance analysis"""
-    def __init__(self, stance: str, confidence: float, target: str, 
-                 target_mentions: int = 0, context_sentiment: float = 0.0,
-                 keyword_score: float = 0.0, combined_score: float = 0.0,
-                 consistency: float = 1.0, fallback_used: bool = False, 
-                 warning: Optional[str] = None):
-        self.stance = stance
-        self.confidence = confidence
-        self.target = target
-        self.target_mentions = target_mentions
-        self.context_sentiment = context_sentiment
-        self.keyword_score = keyword_score
-        self.combined_score = combined_score
-        self.consistency = consistency
-        self.fallback_used = fallback_used
-        self.warning = warning
+    stance: str
+    confidence: float
+    target: str
+    target_mentions: int = 0
+    context_sentiment: float = 0.0
+    keyword_score: float = 0.0
+    combined_score: float = 0.0
+    consistency: float = 1.0
+    fallback_used: bool = False
+    warning: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class _TextStats:
+    """Per-request text measurements used by the confidence step"""
+    n_words: int         # Words in the preprocessed text
+    n_target_words: int  # Words in the preprocessed target
 
 
 class StanceService:
     """Service for analyzing stance towards specific targets in English text"""
     
+    __slots__ = ('sentiment_analyzer', 'cache_manager')
+    
+    # Configuration for stance analysis
+    MIN_TEXT_LENGTH = 3
+    MAX_TEXT_LENGTH = 5000
+    CONTEXT_WINDOW = 50  # Characters around target mention to analyze
+    MIN_CONFIDENCE_THRESHOLD = 0.1
+    NEUTRAL_THRESHOLD = 0.12  # Threshold for neutral stance
+    
+    # Keywords that might indicate stance
+    POSITIVE_INDICATORS = _POSITIVE_INDICATORS
+    NEGATIVE_INDICATORS = _NEGATIVE_INDICATORS
+    
+    # Modifiers that can change stance intensity
+    INTENSIFIERS = _INTENSIFIERS
+    DIMINISHERS = _DIMINISHERS
+    
+    # Negation words that can flip stance
+    NEGATION_WORDS = _NEGATION_WORDS
+    
     def __init__(self):
         self.sentiment_analyzer = SentimentIntensityAnalyzer()
         self.cache_manager = get_cache_manager()
-        
-        # Configuration for stance analysis
-        self.MIN_TEXT_LENGTH = 3
-        self.MAX_TEXT_LENGTH = 5000
-        self.CONTEXT_WINDOW = 50  # Characters around target mention to analyze
-        self.MIN_CONFIDENCE_THRESHOLD = 0.1
-        self.NEUTRAL_THRESHOLD = 0.12  # Threshold for neutral stance
-        
-        # Keywords that might indicate stance
-        self.POSITIVE_INDICATORS = [
-            'love', 'like', 'great', 'excellent', 'amazing', 'wonderful', 'fantastic',
-            'good', 'best', 'awesome', 'perfect', 'brilliant', 'outstanding', 'superb',
-            'support', 'endorse', 'recommend', 'praise', 'admire', 'appreciate',
-            'trust', 'respect', 'favor', 'champion', 'defend', 'celebrate', 'embrace'
-        ]
-        
-        self.NEGATIVE_INDICATORS = [
-            'hate', 'dislike', 'terrible', 'awful', 'horrible', 'bad', 'worst',
-            'disgusting', 'pathetic', 'useless', 'garbage', 'trash', 'sucks',
-            'oppose', 'against', 'criticize', 'condemn', 'reject', 'disapprove',
-            'distrust', 'despise', 'attack', 'blame', 'fault', 'boycott', 'avoid',
-            'overpriced', 'worthless', 'disappointing', 'frustrated'
-        ]
-        
-        # Modifiers that can change stance intensity
-        self.INTENSIFIERS = ['very', 'extremely', 'really', 'totally', 'completely', 'absolutely']
-        self.DIMINISHERS = ['somewhat', 'slightly', 'kind of', 'sort of', 'a bit', 'rather']
-        
-        # Negation words that can flip stance
-        self.NEGATION_WORDS = ['not', 'no', 'never', 'nothing', 'nobody', 'nowhere', 
-                              'neither', 'nor', 'none', "don't", "doesn't", "didn't", 
-                              "won't", "wouldn't", "can't", "couldn't", "shouldn't"]
     
     def analyze_stance(self, text: str, target: str, request_state=None) -> StanceResult:
         """
@@ -114,19 +161,37 @@ class StanceService:
         if request_state:
             request_state.cache_hit = False
         
+        # Compute and cache the result
+        result = self._compute_stance(text, target)
+        self.cache_manager.set(cache_key, result)
+        
+        return result
+    
+    def _compute_stance(self, text: str, target: str) -> StanceResult:
+        """
+        Run the full stance pipeline for a validated, uncached text/target pair
+        
+        Args:
+            text: Non-empty input text
+            target: Non-empty target entity
+            
+        Returns:
+            StanceResult with stance classification and confidence
+        """
         # Check text length constraints
         text_length_check = self._check_text_length(text, target)
         if text_length_check:
-            # Cache the result before returning
-            self.cache_manager.set(cache_key, text_length_check)
             return text_length_check
         
         # Preprocess text and target
         processed_text = self._preprocess_text(text)
         processed_target = self._preprocess_target(target)
         
+        # Lowercase once; mention search and keyword scoring share it
+        text_lower = processed_text.lower()
+        
         # Find target mentions in the text
-        target_positions = self._find_target_mentions(processed_text, processed_target)
+        target_positions = self._find_target_mentions(processed_text, processed_target, text_lower)
         
         if not target_positions:
             # Target not found in text - return neutral with low confidence
@@ -138,31 +203,39 @@ class StanceService:
                 fallback_used=True,
                 warning=f"Target '{target}' not found in the provided text"
             )
-            # Cache the result before returning
-            self.cache_manager.set(cache_key, result)
             return result
         
+        # Score each context window once; shared by sentiment and consistency
+        context_compounds = self._context_compounds(processed_text, target_positions)
+        
         # Analyze context around target mentions
-        context_sentiment = self._analyze_context_sentiment(processed_text, target_positions)
+        context_sentiment = self._analyze_context_sentiment(
+            processed_text, target_positions, context_compounds
+        )
         
         # Perform keyword-based stance detection
-        keyword_stance_score = self._analyze_keyword_based_stance(processed_text, target_positions)
+        keyword_stance_score = self._analyze_keyword_based_stance(
+            processed_text, target_positions, text_lower
+        )
         
         # Combine sentiment and keyword analysis
         combined_score = self._combine_stance_signals(context_sentiment, keyword_stance_score)
         
         # Handle conflicting stances in the same text
-        stance_consistency = self._check_stance_consistency(processed_text, target_positions)
+        stance_consistency = self._check_stance_consistency(
+            processed_text, target_positions, context_compounds
+        )
         
         # Determine final stance
         stance = self._classify_stance(combined_score)
         
         # Calculate confidence with consistency adjustment
-        confidence = self._calculate_confidence(
-            combined_score, len(target_positions), processed_text, processed_target, stance_consistency
+        confidence = self._calculate_confidence_from_stats(
+            combined_score, len(target_positions),
+            self._compute_text_stats(processed_text, processed_target), stance_consistency
         )
         
-        result = StanceResult(
+        return StanceResult(
             stance=stance,
             confidence=confidence,
             target=target,
@@ -172,11 +245,6 @@ class StanceService:
             combined_score=combined_score,
             consistency=stance_consistency
         )
-        
-        # Cache the result
-        self.cache_manager.set(cache_key, result)
-        
-        return result
     
     def _preprocess_text(self, text: str) -> str:
         """
@@ -192,7 +260,7 @@ class StanceService:
             return ""
         
         # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text.strip())
+        text = _collapse_whitespace(text)
         
         # Convert to lowercase for analysis (but preserve original case for display)
         return text
@@ -211,7 +279,7 @@ class StanceService:
             return ""
         
         # Remove extra whitespace and normalize
-        target = re.sub(r'\s+', ' ', target.strip())
+        target = _collapse_whitespace(target)
         return target
     
     def _check_text_length(self, text: str, target: str) -> Optional[StanceResult]:
@@ -243,7 +311,8 @@ class StanceService:
             # Continue with analysis but mark as fallback
             processed_text = self._preprocess_text(truncated_text)
             processed_target = self._preprocess_target(target)
-            target_positions = self._find_target_mentions(processed_text, processed_target)
+            text_lower = processed_text.lower()
+            target_positions = self._find_target_mentions(processed_text, processed_target, text_lower)
             
             if not target_positions:
                 return StanceResult(
@@ -254,13 +323,21 @@ class StanceService:
                     warning=f"Text truncated from {text_length} to {self.MAX_TEXT_LENGTH} characters. Target not found in truncated text."
                 )
             
-            context_sentiment = self._analyze_context_sentiment(processed_text, target_positions)
-            keyword_stance_score = self._analyze_keyword_based_stance(processed_text, target_positions)
+            context_compounds = self._context_compounds(processed_text, target_positions)
+            context_sentiment = self._analyze_context_sentiment(
+                processed_text, target_positions, context_compounds
+            )
+            keyword_stance_score = self._analyze_keyword_based_stance(
+                processed_text, target_positions, text_lower
+            )
             combined_score = self._combine_stance_signals(context_sentiment, keyword_stance_score)
-            stance_consistency = self._check_stance_consistency(processed_text, target_positions)
+            stance_consistency = self._check_stance_consistency(
+                processed_text, target_positions, context_compounds
+            )
             stance = self._classify_stance(combined_score)
-            confidence = self._calculate_confidence(
-                combined_score, len(target_positions), processed_text, processed_target, stance_consistency
+            confidence = self._calculate_confidence_from_stats(
+                combined_score, len(target_positions),
+                self._compute_text_stats(processed_text, processed_target), stance_consistency
             )
             
             return StanceResult(
@@ -278,13 +355,15 @@ class StanceService:
         
         return None
     
-    def _find_target_mentions(self, text: str, target: str) -> List[int]:
+    def _find_target_mentions(self, text: str, target: str,
+                              text_lower: Optional[str] = None) -> List[int]:
         """
         Find all mentions of the target in the text
         
         Args:
             text: Preprocessed text to search in
             target: Target entity to find
+            text_lower: Lowercased text, if the caller already has it
             
         Returns:
             List of character positions where target is mentioned
@@ -292,51 +371,86 @@ class StanceService:
         if not text or not target:
             return []
         
-        positions = []
-        text_lower = text.lower()
+        if text_lower is None:
+            text_lower = text.lower()
         target_lower = target.lower()
         
-        # Find exact matches
+        # Multi-word targets also match on their individual meaningful words
+        target_words = target_lower.split()
+        if len(target_words) > 1:
+            target_words = list(dict.fromkeys(word for word in target_words if len(word) > 2))
+        else:
+            target_words = []
+        
+        # Substring presence is a necessary condition for any boundary match,
+        # so absent targets skip the boundary scan entirely
+        if target_lower not in text_lower and not any(word in text_lower for word in target_words):
+            return []
+        
+        hits = self._scan_target_hits(text_lower, target_lower, target_words)
+        
+        # Exact matches first
+        positions = list(hits[target_lower])
+        
+        # Then partial matches not already covered by an exact match
+        for word in target_words:
+            for pos in hits[word]:
+                if not any(abs(pos - existing_pos) < len(target_lower) for existing_pos in positions):
+                    positions.append(pos)
+        
+        return sorted(set(positions))  # Remove duplicates and sort
+    
+    def _scan_target_hits(self, text_lower: str, target_lower: str,
+                          target_words: List[str]) -> Dict[str, List[int]]:
+        """
+        Find word-boundary matches of the target and each of its words
+        
+        Args:
+            text_lower: Lowercased text to search in
+            target_lower: Lowercased target
+            target_words: Lowercased target words to match individually
+            
+        Returns:
+            Mapping of each pattern to its match positions in text order
+        """
+        patterns = [target_lower] + [word for word in target_words if word != target_lower]
+        return {pattern: self._find_boundary_matches(text_lower, pattern) for pattern in patterns}
+    
+    def _find_boundary_matches(self, text_lower: str, pattern: str) -> List[int]:
+        """
+        Find word-boundary occurrences of pattern, overlapping ones included
+        
+        Args:
+            text_lower: Lowercased text to search in
+            pattern: Lowercased pattern to find
+            
+        Returns:
+            Match positions in text order
+        """
+        positions = []
         start = 0
         while True:
-            pos = text_lower.find(target_lower, start)
+            pos = text_lower.find(pattern, start)
             if pos == -1:
                 break
             
             # Check if it's a word boundary match (not part of another word)
-            if self._is_word_boundary_match(text_lower, target_lower, pos):
+            if self._is_word_boundary_match(text_lower, pattern, pos):
                 positions.append(pos)
             
             start = pos + 1
         
-        # Also try to find partial matches or variations
-        # Split target into words and look for individual words
-        target_words = target_lower.split()
-        if len(target_words) > 1:
-            for word in target_words:
-                if len(word) > 2:  # Only consider meaningful words
-                    start = 0
-                    while True:
-                        pos = text_lower.find(word, start)
-                        if pos == -1:
-                            break
-                        
-                        if self._is_word_boundary_match(text_lower, word, pos):
-                            # Only add if not already covered by exact match
-                            if not any(abs(pos - existing_pos) < len(target_lower) for existing_pos in positions):
-                                positions.append(pos)
-                        
-                        start = pos + 1
-        
-        return sorted(list(set(positions)))  # Remove duplicates and sort
+        return positions
     
-    def _analyze_keyword_based_stance(self, text: str, positions: List[int]) -> float:
+    def _analyze_keyword_based_stance(self, text: str, positions: List[int],
+                                      text_lower: Optional[str] = None) -> float:
         """
         Analyze stance using keyword-based detection around target mentions
         
         Args:
             text: Preprocessed text
             positions: List of target mention positions
+            text_lower: Lowercased text, if the caller already has it
             
         Returns:
             Keyword-based stance score (-1 to 1)
@@ -345,25 +459,39 @@ class StanceService:
             return 0.0
         
         keyword_scores = []
-        text_lower = text.lower()
+        if text_lower is None:
+            text_lower = text.lower()
+        
+        window = self.CONTEXT_WINDOW * 2
+        text_length = len(text)
+        
+        # Mentions whose windows clip to the same span (every mention in a
+        # text shorter than the window) share one tokenisation and score;
+        # the target word position is derived from the words alone
+        span_scores: Dict[Tuple[int, int], float] = {}
         
         for pos in positions:
             # Extract extended context for keyword analysis
-            start = max(0, pos - self.CONTEXT_WINDOW * 2)
-            end = min(len(text), pos + self.CONTEXT_WINDOW * 2)
-            context = text_lower[start:end]
-            context_words = context.split()
+            start = max(0, pos - window)
+            end = min(text_length, pos + window)
+            span = (start, end)
+            score = span_scores.get(span)
             
-            # Find target position within context words
-            target_word_pos = self._find_target_word_position(context_words, pos - start, text_lower)
+            if score is None:
+                context_words = _tokenize_cached(text_lower[start:end])
+                
+                # Find target position within context words
+                target_word_pos = self._find_target_word_position(context_words, pos - start, text_lower)
+                
+                # Analyze keywords around target
+                score = self._calculate_keyword_score(context_words, target_word_pos)
+                span_scores[span] = score
             
-            # Analyze keywords around target
-            score = self._calculate_keyword_score(context_words, target_word_pos)
             keyword_scores.append(score)
         
         return sum(keyword_scores) / len(keyword_scores) if keyword_scores else 0.0
     
-    def _find_target_word_position(self, context_words: List[str], char_offset: int, full_text: str) -> int:
+    def _find_target_word_position(self, context_words: Sequence[str], char_offset: int, full_text: str) -> int:
         """
         Find the approximate word position of target within context words
         
@@ -378,7 +506,7 @@ class StanceService:
         # Simple approximation - find middle of context
         return len(context_words) // 2
     
-    def _calculate_keyword_score(self, words: List[str], target_pos: int) -> float:
+    def _calculate_keyword_score(self, words: Sequence[str], target_pos: int) -> float:
         """
         Calculate stance score based on keywords around target position
         
@@ -395,39 +523,39 @@ class StanceService:
         start_idx = max(0, target_pos - window_size)
         end_idx = min(len(words), target_pos + window_size)
         
+        polarity_of = _INDICATOR_POLARITY.get
+        
+        # Strip punctuation once for the window plus the modifier/negation
+        # reach around it (3 words before, 2 after); stripped[j] is words[lo + j]
+        lo = max(0, start_idx - 3)
+        stripped = [word.strip(_WORD_PUNCT) for word in words[lo:end_idx + 2]]
+        
         for i in range(start_idx, end_idx):
-            word = words[i].strip('.,!?;:"()[]{}')
-            distance_weight = 1.0 / (abs(i - target_pos) + 1)  # Closer words have more weight
+            j = i - lo
             
-            # Check for positive indicators
-            if word in self.POSITIVE_INDICATORS:
-                word_score = 1.0 * distance_weight
-                
-                # Check for intensifiers/diminishers nearby
-                word_score = self._apply_modifiers(words, i, word_score)
-                
-                # Check for negation
-                word_score = self._apply_negation(words, i, word_score)
-                
-                score += word_score
+            # +1.0 for positive indicators, -1.0 for negative, None otherwise
+            polarity = polarity_of(stripped[j])
+            if polarity is None:
+                continue
             
-            # Check for negative indicators
-            elif word in self.NEGATIVE_INDICATORS:
-                word_score = -1.0 * distance_weight
-                
-                # Check for intensifiers/diminishers nearby
-                word_score = self._apply_modifiers(words, i, word_score)
-                
-                # Check for negation
-                word_score = self._apply_negation(words, i, word_score)
-                
-                score += word_score
+            # Closer words have more weight
+            word_score = polarity / (abs(i - target_pos) + 1)
+            
+            # Check for intensifiers/diminishers nearby
+            word_score = self._apply_modifiers_fast(
+                stripped[max(0, j - 2):j] + stripped[j + 1:j + 3], word_score
+            )
+            
+            # Check for negation
+            word_score = self._apply_negation_fast(stripped[max(0, j - 3):j], word_score)
+            
+            score += word_score
         
         # Normalize score
         max_possible_score = window_size * 2  # Maximum possible absolute score
         return max(-1.0, min(1.0, score / max_possible_score)) if max_possible_score > 0 else 0.0
     
-    def _apply_modifiers(self, words: List[str], word_idx: int, base_score: float) -> float:
+    def _apply_modifiers(self, words: Sequence[str], word_idx: int, base_score: float) -> float:
         """
         Apply intensifiers or diminishers to the base score
         
@@ -440,20 +568,34 @@ class StanceService:
             Modified score
         """
         # Check 2 words before and after for modifiers
-        for i in range(max(0, word_idx - 2), min(len(words), word_idx + 3)):
-            if i == word_idx:
-                continue
-            
-            word = words[i].strip('.,!?;:"()[]{}')
+        neighbours = [
+            words[i].strip(_WORD_PUNCT)
+            for i in range(max(0, word_idx - 2), min(len(words), word_idx + 3))
+            if i != word_idx
+        ]
+        return self._apply_modifiers_fast(neighbours, base_score)
+    
+    def _apply_modifiers_fast(self, neighbours: Sequence[str], base_score: float) -> float:
+        """
+        Apply the first intensifier or diminisher among prepared neighbours
+        
+        Args:
+            neighbours: Punctuation-stripped words within two positions of the
+                current word, in text order, excluding the word itself
+            base_score: Base stance score
             
-            if word in self.INTENSIFIERS:
-                return base_score * 1.5  # Increase intensity
-            elif word in self.DIMINISHERS:
-                return base_score * 0.7  # Decrease intensity
+        Returns:
+            Modified score
+        """
+        for word in neighbours:
+            # 1.5 for intensifiers, 0.7 for diminishers
+            factor = _MODIFIER_FACTORS.get(word)
+            if factor is not None:
+                return base_score * factor
         
         return base_score
     
-    def _apply_negation(self, words: List[str], word_idx: int, base_score: float) -> float:
+    def _apply_negation(self, words: Sequence[str], word_idx: int, base_score: float) -> float:
         """
         Apply negation to flip the stance if negation words are nearby
         
@@ -466,19 +608,23 @@ class StanceService:
             Potentially negated score
         """
         # Check 3 words before for negation (common English pattern)
-        for i in range(max(0, word_idx - 3), word_idx):
-            word = words[i].strip('.,!?;:"()[]{}')
-            
-            if word in self.NEGATION_WORDS:
-                return -base_score  # Flip the stance
-        
-        # Also check for contractions like "don't" directly
-        if word_idx > 0:
-            prev_word = words[word_idx - 1].strip('.,!?;:"()[]{}')
-            if prev_word in self.NEGATION_WORDS:
-                return -base_score
+        # (this window includes the directly preceding word, which covers
+        # contractions like "don't")
+        preceding = [words[i].strip(_WORD_PUNCT) for i in range(max(0, word_idx - 3), word_idx)]
+        return self._apply_negation_fast(preceding, base_score)
+    
+    def _apply_negation_fast(self, preceding: Sequence[str], base_score: float) -> float:
+        """
+        Flip the score if any prepared preceding word is a negation
         
-        return base_score
+        Args:
+            preceding: Punctuation-stripped words (up to three) before the current word
+            base_score: Base stance score
+            
+        Returns:
+            Potentially negated score
+        """
+        return base_score if _NEGATION_SET.isdisjoint(preceding) else -base_score
     
     def _combine_stance_signals(self, sentiment_score: float, keyword_score: float) -> float:
         """
@@ -494,20 +640,22 @@ class StanceService:
         # Weight keyword analysis more heavily as it's more specific to stance
         combined = (sentiment_score * 0.4) + (keyword_score * 0.6)
         
-        # If both signals agree strongly, boost the confidence
-        if abs(sentiment_score) > 0.3 and abs(keyword_score) > 0.3:
-            if (sentiment_score > 0 and keyword_score > 0) or (sentiment_score < 0 and keyword_score < 0):
-                combined *= 1.2  # Boost when both agree
+        # If both signals agree strongly, boost the confidence (x1.2); the
+        # product is positive exactly when both strong signals share a sign
+        agree = abs(sentiment_score) > 0.3 and abs(keyword_score) > 0.3 and sentiment_score * keyword_score > 0
+        combined *= _AGREEMENT_BOOST[agree]
         
         return max(-1.0, min(1.0, combined))
     
-    def _check_stance_consistency(self, text: str, positions: List[int]) -> float:
+    def _check_stance_consistency(self, text: str, positions: List[int],
+                                  compounds: Optional[List[float]] = None) -> float:
         """
         Check for conflicting stances within the same text
         
         Args:
             text: Preprocessed text
             positions: List of target mention positions
+            compounds: Precomputed per-mention compounds from _context_compounds
             
         Returns:
             Consistency score (0.0 = very inconsistent, 1.0 = very consistent)
@@ -515,17 +663,8 @@ class StanceService:
         if len(positions) <= 1:
             return 1.0  # Single mention is always consistent
         
-        stance_scores = []
-        
-        for pos in positions:
-            # Analyze each mention independently
-            start = max(0, pos - self.CONTEXT_WINDOW)
-            end = min(len(text), pos + self.CONTEXT_WINDOW)
-            context = text[start:end]
-            
-            # Get sentiment for this specific context
-            scores = self.sentiment_analyzer.polarity_scores(context)
-            stance_scores.append(scores['compound'])
+        # Analyze each mention independently
+        stance_scores = compounds if compounds is not None else self._context_compounds(text, positions)
         
         if not stance_scores:
             return 1.0
@@ -554,25 +693,58 @@ class StanceService:
         # Check character before
         if position > 0:
             char_before = text[position - 1]
-            if char_before.isalnum():
+            if char_before.isalnum() or char_before == '_':
                 return False
         
         # Check character after
         end_pos = position + len(target)
         if end_pos < len(text):
             char_after = text[end_pos]
-            if char_after.isalnum():
+            if char_after.isalnum() or char_after == '_':
                 return False
         
         return True
     
-    def _analyze_context_sentiment(self, text: str, positions: List[int]) -> float:
+    def _context_compounds(self, text: str, positions: List[int]) -> List[float]:
+        """
+        Get the VADER compound score of the context window around each mention
+        
+        Windows that clip to the same span (e.g. every mention in a text
+        shorter than the window) are only scored once.
+        
+        Args:
+            text: Preprocessed text
+            positions: List of target mention positions
+            
+        Returns:
+            Compound score per position, in the same order
+        """
+        window = self.CONTEXT_WINDOW
+        text_length = len(text)
+        polarity_scores = self.sentiment_analyzer.polarity_scores
+        span_scores: Dict[Tuple[int, int], float] = {}
+        compounds = []
+        
+        for pos in positions:
+            # Extract context window around the target
+            span = (max(0, pos - window), min(text_length, pos + window))
+            compound = span_scores.get(span)
+            if compound is None:
+                compound = polarity_scores(text[span[0]:span[1]])['compound']
+                span_scores[span] = compound
+            compounds.append(compound)
+        
+        return compounds
+    
+    def _analyze_context_sentiment(self, text: str, positions: List[int],
+                                   compounds: Optional[List[float]] = None) -> float:
         """
         Analyze sentiment in the context around target mentions
         
         Args:
             text: Preprocessed text
             positions: List of target mention positions
+            compounds: Precomputed per-mention compounds from _context_compounds
             
         Returns:
             Average sentiment score for all contexts
@@ -580,17 +752,7 @@ class StanceService:
         if not positions:
             return 0.0
         
-        context_sentiments = []
-        
-        for pos in positions:
-            # Extract context window around the target
-            start = max(0, pos - self.CONTEXT_WINDOW)
-            end = min(len(text), pos + self.CONTEXT_WINDOW)
-            context = text[start:end]
-            
-            # Analyze sentiment of the context
-            scores = self.sentiment_analyzer.polarity_scores(context)
-            context_sentiments.append(scores['compound'])
+        context_sentiments = compounds if compounds is not None else self._context_compounds(text, positions)
         
         # Return average sentiment across all contexts
         return sum(context_sentiments) / len(context_sentiments) if context_sentiments else 0.0
@@ -612,6 +774,23 @@ class StanceService:
         else:
             return 'neutral'  # Neutral
     
+    def _compute_text_stats(self, text: str, target: str) -> _TextStats:
+        """
+        Measure text and target once for the confidence step
+        
+        Args:
+            text: Preprocessed text (whitespace already collapsed)
+            target: Preprocessed target (whitespace already collapsed)
+            
+        Returns:
+            _TextStats for the pair
+        """
+        # Collapsed whitespace means words are separated by single spaces
+        return _TextStats(
+            n_words=text.count(' ') + 1 if text else 0,
+            n_target_words=target.count(' ') + 1 if target else 0
+        )
+    
     def _calculate_confidence(self, combined_score: float, mention_count: int, 
                              text: str, target: str, consistency: float = 1.0) -> float:
         """
@@ -624,6 +803,23 @@ class StanceService:
             target: Target entity
             consistency: Stance consistency score across multiple mentions
             
+        Returns:
+            Confidence score between 0.1 and 1.0
+        """
+        stats = self._compute_text_stats(_collapse_whitespace(text), _collapse_whitespace(target))
+        return self._calculate_confidence_from_stats(combined_score, mention_count, stats, consistency)
+    
+    def _calculate_confidence_from_stats(self, combined_score: float, mention_count: int,
+                                         stats: _TextStats, consistency: float = 1.0) -> float:
+        """
+        Calculate confidence score from precomputed text measurements
+        
+        Args:
+            combined_score: Combined stance score from sentiment and keyword analysis
+            mention_count: Number of target mentions found
+            stats: Measurements of the preprocessed text and target
+            consistency: Stance consistency score across multiple mentions
+            
         Returns:
             Confidence score between 0.1 and 1.0
         """
@@ -640,15 +836,14 @@ class StanceService:
         base_confidence *= consistency  # Inconsistent stances reduce confidence
         
         # Adjust based on text length
-        word_count = len(text.split())
+        word_count = stats.n_words
         if word_count < 5:
             base_confidence = max(0.1, base_confidence - 0.2)
         elif word_count > 50:
             base_confidence = min(1.0, base_confidence + 0.1)
         
         # Adjust based on target specificity
-        target_word_count = len(target.split())
-        if target_word_count > 1:
+        if stats.n_target_words > 1:
             base_confidence = min(1.0, base_confidence + 0.05)  # More specific targets
         
         # Bonus for very clear stances
@@ -656,4 +851,4 @@ class StanceService:
             base_confidence = min(1.0, base_confidence + 0.1)
         
         # Ensure confidence is within bounds
-        return max(self.MIN_CONFIDENCE_THRESHOLD, min(1.0, base_confidence))
\ No newline at end of file
+        return max(self.MIN_CONFIDENCE_THRESHOLD, min(1.0, base_confidence))
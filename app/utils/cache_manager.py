@@ -4,7 +4,7 @@ In-Memory Cache Manager for Sentiment and Stance Analysis Results
 import hashlib
 import time
 import logging
-from typing import Dict, Any, Optional, Tuple, Union
+from typing import Dict, Any, Optional, Tuple, Union, List
 from datetime import datetime, timedelta
 import threading
 from dataclasses import dataclass
@@ -78,26 +78,21 @@ class CacheManager:
         with self._lock:
             # Periodic cleanup
             self._maybe_cleanup()
+            return self._get_entry(key)
+    
+    def get_many(self, keys: List[str]) -> List[Optional[Any]]:
+        """
+        Get several values from cache under a single lock acquisition
+        
+        Args:
+            keys: Cache keys
             
-            if key not in self._cache:
-                self._stats['misses'] += 1
-                logger.debug(f"Cache MISS for key: {key[:50]}...")
-                return None
-            
-            entry = self._cache[key]
-            
-            # Check if expired
-            if entry.is_expired():
-                del self._cache[key]
-                self._stats['expired_removals'] += 1
-                self._stats['misses'] += 1
-                logger.debug(f"Cache MISS (expired) for key: {key[:50]}...")
-                return None
-            
-            # Cache hit
-            self._stats['hits'] += 1
-            logger.debug(f"Cache HIT for key: {key[:50]}... (access count: {entry.access_count + 1})")
-            return entry.access()
+        Returns:
+            List aligned with keys holding the cached value or None per key
+        """
+        with self._lock:
+            self._maybe_cleanup()
+            return [self._get_entry(key) for key in keys]
     
     def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
         """
@@ -108,25 +103,78 @@ class CacheManager:
             value: Value to cache
             ttl: Time-to-live in seconds (uses default if None)
         """
+        with self._lock:
+            self._set_entry(key, value, ttl or self.default_ttl, time.time())
+    
+    def set_many(self, items: Dict[str, Any], ttl: Optional[int] = None) -> None:
+        """
+        Set several values in cache under a single lock acquisition
+        
+        Args:
+            items: Mapping of cache key to value
+            ttl: Time-to-live in seconds applied to every item (uses default if None)
+        """
         with self._lock:
             ttl = ttl or self.default_ttl
             current_time = time.time()
+            for key, value in items.items():
+                self._set_entry(key, value, ttl, current_time)
+    
+    def _get_entry(self, key: str) -> Optional[Any]:
+        """
+        Look up a single key; caller must hold the lock
+        
+        Args:
+            key: Cache key
             
-            # Create cache entry
-            entry = CacheEntry(
-                data=value,
-                created_at=current_time,
-                expires_at=current_time + ttl,
-                last_accessed=current_time
-            )
-            
-            # Check if we need to evict entries
-            if len(self._cache) >= self.max_size and key not in self._cache:
-                logger.info(f"Cache size limit reached ({self.max_size}), evicting entries...")
-                self._evict_entries()
-            
-            self._cache[key] = entry
-            logger.debug(f"Cache SET for key: {key[:50]}... (TTL: {ttl}s)")
+        Returns:
+            Cached value if found and not expired, None otherwise
+        """
+        if key not in self._cache:
+            self._stats['misses'] += 1
+            logger.debug(f"Cache MISS for key: {key[:50]}...")
+            return None
+        
+        entry = self._cache[key]
+        
+        # Check if expired
+        if entry.is_expired():
+            del self._cache[key]
+            self._stats['expired_removals'] += 1
+            self._stats['misses'] += 1
+            logger.debug(f"Cache MISS (expired) for key: {key[:50]}...")
+            return None
+        
+        # Cache hit
+        self._stats['hits'] += 1
+        logger.debug(f"Cache HIT for key: {key[:50]}... (access count: {entry.access_count + 1})")
+        return entry.access()
+    
+    def _set_entry(self, key: str, value: Any, ttl: int, current_time: float) -> None:
+        """
+        Store a single entry; caller must hold the lock
+        
+        Args:
+            key: Cache key
+            value: Value to cache
+            ttl: Time-to-live in seconds
+            current_time: Timestamp used for creation and last access
+        """
+        # Create cache entry
+        entry = CacheEntry(
+            data=value,
+            created_at=current_time,
+            expires_at=current_time + ttl,
+            last_accessed=current_time
+        )
+        
+        # Check if we need to evict entries
+        if len(self._cache) >= self.max_size and key not in self._cache:
+            logger.info(f"Cache size limit reached ({self.max_size}), evicting entries...")
+            self._evict_entries()
+        
+        self._cache[key] = entry
+        logger.debug(f"Cache SET for key: {key[:50]}... (TTL: {ttl}s)")
     
     def delete(self, key: str) -> bool:
         """
@@ -398,6 +446,11 @@ class CacheManager:
         """
         Generate cache key for sentiment analysis
         
+        Keys use a 128-bit BLAKE2b digest. This is faster than MD5/SHA-2
+        for text-sized inputs and gives ample collision resistance for
+        cache lookups; keys are not meant to be cryptographically
+        authenticated.
+        
         Args:
             text: Input text
             
@@ -405,36 +458,20 @@ class CacheManager:
             Cache key string
         """
         # Create hash of the text for consistent key generation
-        text_hash = hashlib.md5(text.encode('utf-8')).hexdigest()
+        text_hash = hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
         return f"sentiment:{text_hash}"
     
-    def generate_stance_key(self, text: str, target: str) -> str:
+    def generate_sentiment_keys(self, texts: List[str]) -> List[str]:
         """
-        Generate cache key for stance analysis
+        Generate cache keys for a batch of sentiment analysis inputs
         
         Args:
-            text: Input text
-            target: Target entity
+            texts: Input texts
             
         Returns:
-            Cache key string
-        """
-        # Create hash of text + target combination
-        combined = f"{text}|{target}"
-        combined_hash = hashlib.md5(combined.encode('utf-8')).hexdigest()
-        return f"stance:{combined_hash}"
+            Cache key strings aligned with texts
         """
-        Generate cache key for sentiment analysis
-        
-        Args:
-            text: Input text
-            
-        Returns:
-            Cache key string
-        """
-        # Create hash of the text for consistent key generation
-        text_hash = hashlib.md5(text.encode('utf-8')).hexdigest()
-        return f"sentiment:{text_hash}"
+        return [self.generate_sentiment_key(text) for text in texts]
     
     def generate_stance_key(self, text: str, target: str) -> str:
         """
@@ -449,7 +486,7 @@ class CacheManager:
         """
         # Create hash of text + target combination
         combined = f"{text}|{target}"
-        combined_hash = hashlib.md5(combined.encode('utf-8')).hexdigest()
+        combined_hash = hashlib.blake2b(combined.encode('utf-8'), digest_size=16).hexdigest()
         return f"stance:{combined_hash}"
 
 
@@ -4,6 +4,8 @@ Text processing utilities for sentiment and stance analysis.
 
 import re
 import string
+import sys
+from functools import lru_cache
 from typing import Optional, List
 from langdetect import detect, DetectorFactory
 from langdetect.lang_detect_exception import LangDetectException
@@ -12,67 +14,181 @@ from langdetect.lang_detect_exception import LangDetectException
 # Set seed for consistent language detection results
 DetectorFactory.seed = 0
 
+# Script checks that settle language detection without langdetect
+_ARABIC_CHAR_PATTERN = re.compile(r'[\u0600-\u06FF]')
+_LATIN_LETTER_PATTERN = re.compile(r'[A-Za-z]')
+_MAX_NON_LETTER_RATIO = 0.05
+
+# Deleting ASCII letters and spaces leaves exactly the non-letter characters
+_LETTER_BYTES = (string.ascii_letters + ' ').encode('ascii')
+_LETTER_DELETE_TABLE = str.maketrans('', '', string.ascii_letters + ' ')
+
+
+def _count_non_letters(text: str) -> int:
+    """Count characters other than ASCII letters and spaces."""
+    if text.isascii():
+        # bytes.translate deletes in a tight C loop
+        return len(text.encode('ascii').translate(None, _LETTER_BYTES))
+    return len(text.translate(_LETTER_DELETE_TABLE))
+
+# Texts up to this length have their langdetect verdict memoised
+_DETECTION_CACHE_MAX_CHARS = 512
+
+
+@lru_cache(maxsize=4096)
+def _detect_is_english_cached(text: str) -> Optional[bool]:
+    """Memoised langdetect verdict for short texts (None if detection fails)."""
+    return _detect_is_english(text)
+
+
+def _detect_is_english(text: str) -> Optional[bool]:
+    """Run langdetect on text; None if it cannot decide."""
+    try:
+        return detect(text) == 'en'
+    except LangDetectException:
+        return None
+
+
+def _keep_hashtag_word(match: re.Match) -> str:
+    """Replacement for fused token noise: a hashtag's word, else a space."""
+    return match.group('hashtag') or ' '
+
+
+# Non-ASCII letters that re.IGNORECASE matches against the ASCII letters
+# of a contraction, mapped back to those letters
+_CONTRACTION_FOLD_TABLE = str.maketrans({'\u017f': 's', '\u0131': 'i', '\u0130': 'i'})
+
+
+# Common English words for the short-text heuristic
+_COMMON_ENGLISH_WORDS = frozenset({
+    'the', 'be', 'to', 'of', 'and', 'a', 'in', 'that', 'have',
+    'i', 'it', 'for', 'not', 'on', 'with', 'he', 'as', 'you',
+    'do', 'at', 'this', 'but', 'his', 'by', 'from', 'they',
+    'we', 'say', 'her', 'she', 'or', 'an', 'will', 'my',
+    'one', 'all', 'would', 'there', 'their', 'what', 'so',
+    'up', 'out', 'if', 'about', 'who', 'get', 'which', 'go', 'me'
+})
+
+# Common words that are not also everyday words in other Latin-script
+# languages ('a', 'do', 'in' and 'so' appear in Spanish, Portuguese,
+# Italian or German text just as often); only these decide English
+# without the detector
+_DISTINCTIVE_ENGLISH_WORDS = _COMMON_ENGLISH_WORDS - frozenset({
+    'a', 'all', 'an', 'as', 'at', 'by', 'do', 'for', 'go', 'he', 'her',
+    'i', 'in', 'me', 'my', 'of', 'on', 'or', 'so', 'to', 'we', 'will'
+})
+_MIN_DISTINCTIVE_WORDS = 2
+_MIN_DISTINCTIVE_RATIO = 0.3
+
+# Characters clean_text keeps; everything else becomes a space
+_CLEAN_KEEP_PATTERN = r'[\w\s.,!?;:\-\'"()]'
+
+# ASCII translation tables applying the same punctuation filter in one
+# table lookup per character, optionally lowercasing at the same time
+_ASCII_PUNCT_TABLE = str.maketrans({
+    chr(c): ' ' for c in range(128) if not re.match(_CLEAN_KEEP_PATTERN, chr(c))
+})
+_ASCII_PUNCT_LOWER_TABLE = {**_ASCII_PUNCT_TABLE, **str.maketrans(string.ascii_uppercase, string.ascii_lowercase)}
+
 
 class TextProcessor:
     """
     Text processor for cleaning and preprocessing text for sentiment and stance analysis.
     """
     
-    def __init__(self):
-        """Initialize the TextProcessor."""
-        # Common English contractions mapping
-        self.contractions = {
-            "ain't": "am not",
-            "aren't": "are not", 
-            "can't": "cannot",
-            "couldn't": "could not",
-            "didn't": "did not",
-            "doesn't": "does not",
-            "don't": "do not",
-            "hadn't": "had not",
-            "hasn't": "has not",
-            "haven't": "have not",
-            "he'd": "he would",
-            "he'll": "he will",
-            "he's": "he is",
-            "i'd": "i would",
-            "i'll": "i will",
-            "i'm": "i am",
-            "i've": "i have",
-            "isn't": "is not",
-            "it'd": "it would",
-            "it'll": "it will",
-            "it's": "it is",
-            "let's": "let us",
-            "shouldn't": "should not",
-            "that's": "that is",
-            "there's": "there is",
-            "they'd": "they would",
-            "they'll": "they will",
-            "they're": "they are",
-            "they've": "they have",
-            "we'd": "we would",
-            "we're": "we are",
-            "we've": "we have",
-            "weren't": "were not",
-            "what's": "what is",
-            "where's": "where is",
-            "who's": "who is",
-            "won't": "will not",
-            "wouldn't": "would not",
-            "you'd": "you would",
-            "you'll": "you will",
-            "you're": "you are",
-            "you've": "you have"
-        }
-        
-        # Patterns for cleaning
-        self.url_pattern = re.compile(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+')
-        self.email_pattern = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
-        self.mention_pattern = re.compile(r'@\w+')
-        self.hashtag_pattern = re.compile(r'#\w+')
-        self.extra_whitespace_pattern = re.compile(r'\s+')
-        
+    # Common English contractions mapping
+    contractions = {
+        "ain't": "am not",
+        "aren't": "are not", 
+        "can't": "cannot",
+        "couldn't": "could not",
+        "didn't": "did not",
+        "doesn't": "does not",
+        "don't": "do not",
+        "hadn't": "had not",
+        "hasn't": "has not",
+        "haven't": "have not",
+        "he'd": "he would",
+        "he'll": "he will",
+        "he's": "he is",
+        "i'd": "i would",
+        "i'll": "i will",
+        "i'm": "i am",
+        "i've": "i have",
+        "isn't": "is not",
+        "it'd": "it would",
+        "it'll": "it will",
+        "it's": "it is",
+        "let's": "let us",
+        "shouldn't": "should not",
+        "that's": "that is",
+        "there's": "there is",
+        "they'd": "they would",
+        "they'll": "they will",
+        "they're": "they are",
+        "they've": "they have",
+        "we'd": "we would",
+        "we're": "we are",
+        "we've": "we have",
+        "weren't": "were not",
+        "what's": "what is",
+        "where's": "where is",
+        "who's": "who is",
+        "won't": "will not",
+        "wouldn't": "would not",
+        "you'd": "you would",
+        "you'll": "you will",
+        "you're": "you are",
+        "you've": "you have"
+    }
+    # Interned so every substitution hands out one shared object per
+    # expansion
+    contractions = {sys.intern(k): sys.intern(v) for k, v in contractions.items()}
+    
+    # Patterns for cleaning
+    # One character class for the URL body: '!', the '$'..'_' range
+    # (digits, uppercase, '%' escapes and the listed punctuation) and
+    # lowercase letters, the same set the per-character alternation matched
+    url_pattern = re.compile(r'https?://[!$-_a-z]+')
+    email_pattern = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+    mention_pattern = re.compile(r'@\w+')
+    hashtag_pattern = re.compile(r'#\w+')
+    extra_whitespace_pattern = re.compile(r'\s+')
+    sentence_boundary_pattern = re.compile(r'[.!?]+')
+    
+    # Fused single-token noise patterns, applied after URLs and emails are
+    # removed, with alternatives ordered like the sequential passes they
+    # replace
+    _social_token_re = re.compile(mention_pattern.pattern + r'|#(?P<hashtag>\w+)')
+    # '#' that starts a hashtag; deleting it after the mention pass keeps
+    # the hashtag's word with plain-string substitutions only
+    _hashtag_sign_re = re.compile(r'#(?=\w)')
+    _clean_token_noise_re = re.compile(
+        _social_token_re.pattern + '|[^' + _CLEAN_KEEP_PATTERN[1:]
+    )
+    # Detection noise absorbs surrounding whitespace, so each run of noise
+    # and spaces collapses to one space in the same pass
+    _detection_token_noise_re = re.compile(
+        '(?:' + mention_pattern.pattern + '|' + hashtag_pattern.pattern + r'|\d+|[^\w\s]|\s)+'
+    )
+    
+    # Single alternation over all contractions (longest first to avoid
+    # partial replacements); the lowercased match is the dictionary key
+    _contractions_re = re.compile(
+        '|'.join(map(re.escape, sorted(contractions, key=len, reverse=True))),
+        re.IGNORECASE
+    )
+    
+    # Negation words and intensifiers doubled for sentiment emphasis; one
+    # group per word so the canonical form replaces whatever case matched
+    negation_words = ('not', 'no', 'never', 'nothing', 'nowhere', 'nobody', 'none', 'neither', 'nor')
+    intensifiers = ('very', 'really', 'extremely', 'incredibly', 'absolutely', 'totally')
+    _emphasis_replacements = [f'{word} {word}' for word in negation_words + intensifiers]
+    _emphasis_re = re.compile(
+        r'\b(?:' + '|'.join(f'({re.escape(word)})' for word in negation_words + intensifiers) + r')\b',
+        re.IGNORECASE,
+    )
+    
     def is_english_text(self, text: str, confidence_threshold: float = 0.7) -> bool:
         """
         Check if the text is in English.
@@ -84,7 +200,7 @@ class TextProcessor:
         Returns:
             True if text is detected as English, False otherwise
         """
-        if not text or not text.strip():
+        if not text or text.isspace():
             return False
             
         # Remove URLs, mentions, hashtags for better language detection
@@ -93,13 +209,27 @@ class TextProcessor:
         # If text is too short or mostly non-alphabetic, use simple heuristics
         if len(cleaned_text.strip()) < 10:
             return self._is_likely_english_short_text(cleaned_text)
+        
+        # Clear-cut scripts skip langdetect: Arabic without any Latin letters
+        # is never English, and almost purely ASCII-letter text made up
+        # largely of distinctively English words is accepted as English
+        if _ARABIC_CHAR_PATTERN.search(cleaned_text) and not _LATIN_LETTER_PATTERN.search(cleaned_text):
+            return False
+        non_letter_count = _count_non_letters(cleaned_text)
+        if (non_letter_count <= _MAX_NON_LETTER_RATIO * len(cleaned_text) and
+                self._has_distinctive_english_words(cleaned_text)):
+            return True
             
-        try:
-            detected_lang = detect(cleaned_text)
-            return detected_lang == 'en'
-        except LangDetectException:
+        # Repeated payloads (retries, duplicate posts) reuse the verdict
+        if len(cleaned_text) <= _DETECTION_CACHE_MAX_CHARS:
+            is_english = _detect_is_english_cached(cleaned_text)
+        else:
+            is_english = _detect_is_english(cleaned_text)
+        
+        if is_english is None:
             # Fallback to simple heuristics if detection fails
             return self._is_likely_english_short_text(cleaned_text)
+        return is_english
     
     def clean_text(self, text: str, preserve_case: bool = False) -> str:
         """
@@ -112,33 +242,22 @@ class TextProcessor:
         Returns:
             Cleaned text
         """
-        if not text:
-            return ""
-            
-        # Remove URLs
-        text = self.url_pattern.sub(' ', text)
-        
-        # Remove email addresses
-        text = self.email_pattern.sub(' ', text)
-        
-        # Remove mentions and hashtags (but keep the text part of hashtags)
-        text = self.mention_pattern.sub(' ', text)
-        text = self.hashtag_pattern.sub(lambda m: m.group(0)[1:], text)  # Remove # but keep text
-        
-        # Expand contractions
-        text = self._expand_contractions(text)
-        
-        # Remove extra punctuation (keep basic punctuation)
-        text = re.sub(r'[^\w\s.,!?;:\-\'"()]', ' ', text)
-        
-        # Normalize whitespace
-        text = self.extra_whitespace_pattern.sub(' ', text)
+        return self._clean_one(text, preserve_case)
+    
+    def clean_text_batch(self, texts: List[str], preserve_case: bool = False) -> List[str]:
+        """
+        Clean and normalize a batch of texts, same as clean_text on each.
         
-        # Convert to lowercase if not preserving case
-        if not preserve_case:
-            text = text.lower()
+        Args:
+            texts: Raw texts to clean
+            preserve_case: Whether to preserve original case
             
-        return text.strip()
+        Returns:
+            Cleaned texts, in input order
+        """
+        # Bind the pipeline once for the whole batch
+        clean_one = self._clean_one
+        return [clean_one(text, preserve_case) for text in texts]
     
     def preprocess_for_sentiment(self, text: str) -> str:
         """
@@ -153,19 +272,9 @@ class TextProcessor:
         # Clean the text
         cleaned = self.clean_text(text, preserve_case=False)
         
-        # Handle negations - add emphasis to negation words
-        negation_words = ['not', 'no', 'never', 'nothing', 'nowhere', 'nobody', 'none', 'neither', 'nor']
-        for neg_word in negation_words:
-            pattern = r'\b' + re.escape(neg_word) + r'\b'
-            cleaned = re.sub(pattern, f'{neg_word} {neg_word}', cleaned, flags=re.IGNORECASE)
-        
-        # Handle intensifiers
-        intensifiers = ['very', 'really', 'extremely', 'incredibly', 'absolutely', 'totally']
-        for intensifier in intensifiers:
-            pattern = r'\b' + re.escape(intensifier) + r'\b'
-            cleaned = re.sub(pattern, f'{intensifier} {intensifier}', cleaned, flags=re.IGNORECASE)
-            
-        return cleaned
+        # Handle negations and intensifiers - add emphasis by doubling them
+        emphasized = self._emphasis_replacements
+        return self._emphasis_re.sub(lambda m: emphasized[m.lastindex - 1], cleaned)
     
     def preprocess_for_stance(self, text: str, target: str) -> tuple[str, List[str]]:
         """
@@ -199,81 +308,119 @@ class TextProcessor:
         Returns:
             List of sentences
         """
+        if not text:
+            return []
+        
         # Simple sentence splitting on common punctuation
-        sentences = re.split(r'[.!?]+', text)
-        return [s.strip() for s in sentences if s.strip()]
+        sentences = (s.strip() for s in self.sentence_boundary_pattern.split(text))
+        return [s for s in sentences if s]
     
     def _remove_noise_for_detection(self, text: str) -> str:
         """Remove noise that might interfere with language detection."""
-        # Remove URLs, mentions, hashtags, numbers
+        if not text:
+            return ""
+        
+        # Remove URLs, emails, mentions, hashtags, numbers and punctuation,
+        # normalizing whitespace along the way
+        text = self._remove_links(text)
+        return self._detection_token_noise_re.sub(' ', text).strip()
+    
+    def _clean_one(self, text: str, preserve_case: bool) -> str:
+        """Cleaning pipeline shared by clean_text and clean_text_batch."""
+        # Nothing to clean for empty or whitespace-only input
+        if not text or text.isspace():
+            return ""
+            
+        # Remove URLs and email addresses
+        text = self._remove_links(text)
+        
+        if text.isascii():
+            # Remove mentions (hashtags keep their text part), then drop extra
+            # punctuation (keep basic punctuation) and lowercase unless
+            # preserving case, all in one translate
+            text = self._hashtag_sign_re.sub('', self.mention_pattern.sub(' ', text))
+            text = text.translate(_ASCII_PUNCT_TABLE if preserve_case else _ASCII_PUNCT_LOWER_TABLE)
+            
+            # Expand contractions (contractions contain no removed punctuation
+            # and match case-insensitively, and ASCII lowercasing maps each
+            # letter to one letter, so expanding afterwards is equivalent)
+            text = self._expand_contractions(text)
+        else:
+            # Same filtering, fused into one regex pass
+            text = self._clean_token_noise_re.sub(_keep_hashtag_word, text)
+            
+            # Expand contractions before lowercasing: str.lower() can change
+            # length ('İ' becomes 'i' plus a combining dot), which would hide
+            # contractions the case-insensitive match still finds here
+            text = self._expand_contractions(text)
+            
+            # Convert to lowercase if not preserving case
+            if not preserve_case:
+                text = text.lower()
+        
+        # Normalize whitespace
+        text = self.extra_whitespace_pattern.sub(' ', text)
+            
+        return text.strip()
+    
+    def _remove_links(self, text: str) -> str:
+        """Remove URLs, then email addresses (skipped when there is no '@')."""
         text = self.url_pattern.sub(' ', text)
-        text = self.email_pattern.sub(' ', text)
-        text = self.mention_pattern.sub(' ', text)
-        text = self.hashtag_pattern.sub(' ', text)
-        text = re.sub(r'\d+', ' ', text)  # Remove numbers
-        text = re.sub(r'[^\w\s]', ' ', text)  # Remove punctuation
-        return self.extra_whitespace_pattern.sub(' ', text).strip()
+        if '@' in text:
+            text = self.email_pattern.sub(' ', text)
+        return text
+    
+    def _has_distinctive_english_words(self, text: str) -> bool:
+        """Whether enough words are English-only common words to skip detection."""
+        words = text.lower().split()
+        hits = sum(map(_DISTINCTIVE_ENGLISH_WORDS.__contains__, words))
+        return hits >= _MIN_DISTINCTIVE_WORDS and hits >= _MIN_DISTINCTIVE_RATIO * len(words)
     
     def _is_likely_english_short_text(self, text: str) -> bool:
         """Simple heuristics for short text English detection."""
         if not text:
             return False
             
-        # Check for common English words
-        common_english_words = {
-            'the', 'be', 'to', 'of', 'and', 'a', 'in', 'that', 'have',
-            'i', 'it', 'for', 'not', 'on', 'with', 'he', 'as', 'you',
-            'do', 'at', 'this', 'but', 'his', 'by', 'from', 'they',
-            'we', 'say', 'her', 'she', 'or', 'an', 'will', 'my',
-            'one', 'all', 'would', 'there', 'their', 'what', 'so',
-            'up', 'out', 'if', 'about', 'who', 'get', 'which', 'go', 'me'
-        }
-        
         words = text.lower().split()
         if not words:
             return False
             
-        english_word_count = sum(1 for word in words if word in common_english_words)
+        # Check for common English words (repeated words count each time)
+        english_word_count = sum(map(_COMMON_ENGLISH_WORDS.__contains__, words))
         return english_word_count / len(words) >= 0.3  # At least 30% common English words
     
     def _expand_contractions(self, text: str) -> str:
         """Expand contractions in text."""
-        # Sort by length (longest first) to avoid partial replacements
-        sorted_contractions = sorted(self.contractions.items(), key=lambda x: len(x[0]), reverse=True)
+        # Every contraction contains an apostrophe
+        if not text or "'" not in text:
+            return text
         
-        for contraction, expansion in sorted_contractions:
-            # Case-insensitive replacement
-            pattern = re.compile(re.escape(contraction), re.IGNORECASE)
-            text = pattern.sub(expansion, text)
-            
-        return text
+        # Case-insensitive replacement in a single pass
+        return self._contractions_re.sub(self._contraction_expansion, text)
+    
+    def _contraction_expansion(self, match: re.Match) -> str:
+        """Expansion for a contraction matched case-insensitively."""
+        contraction = match.group(0)
+        if not contraction.isascii():
+            # Letters such as the long s that IGNORECASE equates with ASCII
+            contraction = contraction.translate(_CONTRACTION_FOLD_TABLE)
+        return self.contractions[contraction.lower()]
     
     def _generate_target_variations(self, target: str) -> List[str]:
         """Generate variations of the target for better matching."""
-        variations = [target.lower()]
+        base_target = target.lower()
         
-        # Add variations with different cases
-        variations.extend([
+        # Different cases, then common social media prefixes/suffixes
+        variations = (
+            base_target,
             target.upper(),
             target.title(),
-            target.capitalize()
-        ])
-        
-        # Add variations with common prefixes/suffixes
-        base_target = target.lower()
-        variations.extend([
-            f"@{base_target}",  # Social media mention
-            f"#{base_target}",  # Hashtag
+            target.capitalize(),
+            f"@{base_target}",   # Social media mention
+            f"#{base_target}",   # Hashtag
             f"{base_target}'s",  # Possessive
             f"{base_target}s",   # Plural
-        ])
+        )
         
         # Remove duplicates while preserving order
-        seen = set()
-        unique_variations = []
-        for var in variations:
-            if var not in seen:
-                seen.add(var)
-                unique_variations.append(var)
-                
-        return unique_variations
\ No newline at end of file
+        return list(dict.fromkeys(variations))
\ No newline at end of file
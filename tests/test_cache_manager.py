@@ -0,0 +1,60 @@
+"""
+Unit tests for CacheManager
+"""
+import time
+import pytest
+from app.utils.cache_manager import CacheManager
+
+
+class TestCacheManagerBatch:
+    """Test cases for the CacheManager batch API"""
+    
+    def setup_method(self):
+        """Set up test fixtures"""
+        self.cache = CacheManager(max_size=4, default_ttl=60)
+    
+    def test_get_many_mixed_hits_and_misses_keep_key_order(self):
+        """Test get_many returns values aligned with the requested keys"""
+        self.cache.set_many({'a': 1, 'c': 3})
+        
+        assert self.cache.get_many(['c', 'b', 'a', 'missing']) == [3, None, 1, None]
+    
+    def test_get_many_expired_entry_is_a_miss(self):
+        """Test get_many drops entries whose TTL has passed"""
+        self.cache.set_many({'fresh': 'kept', 'stale': 'dropped'})
+        self.cache._cache['stale'].expires_at = time.time() - 1
+        
+        assert self.cache.get_many(['fresh', 'stale']) == ['kept', None]
+        assert 'stale' not in self.cache._cache
+        assert self.cache.get_stats()['expired_removals'] == 1
+    
+    def test_set_many_evicts_past_max_size(self):
+        """Test set_many evicts entries once the cache is full"""
+        items = {f'key{i}': i for i in range(6)}
+        self.cache.set_many(items)
+        
+        stats = self.cache.get_stats()
+        assert stats['size'] <= self.cache.max_size
+        assert stats['evictions'] == len(items) - self.cache.max_size
+        assert self.cache.get_many(['key4', 'key5']) == [4, 5]
+    
+    def test_set_many_applies_ttl_to_every_item(self):
+        """Test set_many uses the given TTL for all entries"""
+        before = time.time()
+        self.cache.set_many({'a': 1, 'b': 2}, ttl=5)
+        
+        for key in ('a', 'b'):
+            entry = self.cache._cache[key]
+            assert entry.expires_at - entry.created_at == pytest.approx(5)
+            assert entry.created_at >= before
+    
+    def test_get_many_updates_hit_and_miss_counters(self):
+        """Test get_many counts one hit or miss per key"""
+        self.cache.set('a', 1)
+        self.cache.get_many(['a', 'b', 'a', 'c'])
+        
+        stats = self.cache.get_stats()
+        assert stats['hits'] == 2
+        assert stats['misses'] == 2
+        assert stats['total_requests'] == 4
+        assert self.cache._cache['a'].access_count == 2
@@ -1,11 +1,36 @@
 """
 Unit tests for SentimentService
 """
+import pickle
 import pytest
 from unittest.mock import Mock, patch
-from app.services.sentiment_service import SentimentService, SentimentResult
+from app.services.sentiment_service import SentimentService, SentimentResult, Scores
 
 
+# Scripted VADER scores for texts whose polarity matters to the branch logic.
+# Anything not listed scores as perfectly neutral.
+_NEUTRAL_SCORES = {'compound': 0.0, 'pos': 0.0, 'neu': 1.0, 'neg': 0.0}
+_SCRIPTED = {
+    "Good bad": {'compound': -0.1531, 'pos': 0.367, 'neu': 0.0, 'neg': 0.633},
+}
+
+
+# Over-length inputs (> 5000 chars), built once at import
+_LONG_TEXT = "This is a great product! " * 300
+_LONG_NORMAL = "This is a test. " * 400
+
+
+@pytest.fixture(scope='class')
+def stub_vader():
+    """Replace the VADER analyzer with a deterministic stub for unit tests"""
+    with patch('app.services.sentiment_service.SentimentIntensityAnalyzer') as mock_analyzer_cls:
+        mock_analyzer_cls.return_value.polarity_scores.side_effect = (
+            lambda text: dict(_SCRIPTED.get(text, _NEUTRAL_SCORES))
+        )
+        yield mock_analyzer_cls
+
+
+@pytest.mark.usefixtures('stub_vader')
 class TestSentimentService:
     """Test cases for SentimentService"""
     
@@ -13,38 +38,6 @@ class TestSentimentService:
         """Set up test fixtures"""
         self.service = SentimentService()
     
-    def test_analyze_sentiment_positive_text(self):
-        """Test sentiment analysis for positive text"""
-        text = "I love this product! It's amazing and wonderful."
-        result = self.service.analyze_sentiment(text)
-        
-        assert isinstance(result, SentimentResult)
-        assert result.sentiment == 'positive'
-        assert result.confidence > 0.5
-        assert result.scores is not None
-        assert 'compound' in result.scores
-        assert result.fallback_used is False
-        assert result.warning is None
-    
-    def test_analyze_sentiment_negative_text(self):
-        """Test sentiment analysis for negative text"""
-        text = "I hate this product! It's terrible and awful."
-        result = self.service.analyze_sentiment(text)
-        
-        assert result.sentiment == 'negative'
-        assert result.confidence > 0.5
-        assert result.scores['compound'] < 0
-        assert result.fallback_used is False
-    
-    def test_analyze_sentiment_neutral_text(self):
-        """Test sentiment analysis for neutral text"""
-        text = "This is a product. It exists."
-        result = self.service.analyze_sentiment(text)
-        
-        assert result.sentiment == 'normal'
-        assert result.confidence >= 0.1
-        assert abs(result.scores['compound']) <= 0.05
-    
     def test_analyze_sentiment_empty_text(self):
         """Test sentiment analysis for empty text"""
         result = self.service.analyze_sentiment("")
@@ -82,8 +75,7 @@ class TestSentimentService:
     
     def test_analyze_sentiment_very_long_text(self):
         """Test sentiment analysis for very long text"""
-        long_text = "This is a great product! " * 300  # Over 5000 chars
-        result = self.service.analyze_sentiment(long_text)
+        result = self.service.analyze_sentiment(_LONG_TEXT)
         
         assert result.sentiment in ['positive', 'negative', 'normal']
         assert result.confidence >= 0.1
@@ -163,8 +155,7 @@ class TestSentimentService:
     
     def test_check_text_length_too_long(self):
         """Test text length check for too long text"""
-        text = "This is a test. " * 400  # Over 5000 chars
-        result = self.service._check_text_length(text)
+        result = self.service._check_text_length(_LONG_NORMAL)
         
         assert result is not None
         assert result.fallback_used is True
@@ -187,27 +178,39 @@ class TestSentimentService:
         ratio = self.service._calculate_symbol_ratio(text)
         assert ratio == 1.0
     
+    def test_compute_stats(self):
+        """Test shared text statistics computation"""
+        original = "  Hello!@#$   world  "
+        processed = self.service._preprocess_text(original)
+        stats = self.service._compute_stats(original, processed)
+        
+        assert stats.n_chars == len(original)
+        assert stats.n_symbols == 4
+        assert stats.n_processed_chars == len(processed)
+        assert stats.n_words == 2
+        assert stats.symbol_ratio == self.service._calculate_symbol_ratio(original)
+    
     def test_classify_sentiment_positive(self):
         """Test sentiment classification for positive scores"""
-        scores = {'compound': 0.8, 'pos': 0.7, 'neu': 0.2, 'neg': 0.1}
+        scores = Scores(compound=0.8, pos=0.7, neu=0.2, neg=0.1)
         sentiment = self.service._classify_sentiment(scores)
         assert sentiment == 'positive'
     
     def test_classify_sentiment_negative(self):
         """Test sentiment classification for negative scores"""
-        scores = {'compound': -0.8, 'pos': 0.1, 'neu': 0.2, 'neg': 0.7}
+        scores = Scores(compound=-0.8, pos=0.1, neu=0.2, neg=0.7)
         sentiment = self.service._classify_sentiment(scores)
         assert sentiment == 'negative'
     
     def test_classify_sentiment_neutral(self):
         """Test sentiment classification for neutral scores"""
-        scores = {'compound': 0.02, 'pos': 0.3, 'neu': 0.4, 'neg': 0.3}
+        scores = Scores(compound=0.02, pos=0.3, neu=0.4, neg=0.3)
         sentiment = self.service._classify_sentiment(scores)
         assert sentiment == 'normal'
     
     def test_calculate_confidence_high_compound(self):
         """Test confidence calculation for high compound scores"""
-        scores = {'compound': 0.9, 'pos': 0.8, 'neu': 0.1, 'neg': 0.1}
+        scores = Scores(compound=0.9, pos=0.8, neu=0.1, neg=0.1)
         confidence = self.service._calculate_confidence(scores, "This is a great product!", "this is a great product")
         
         assert confidence > 0.8
@@ -215,7 +218,7 @@ class TestSentimentService:
     
     def test_calculate_confidence_low_compound(self):
         """Test confidence calculation for low compound scores"""
-        scores = {'compound': 0.1, 'pos': 0.4, 'neu': 0.4, 'neg': 0.2}
+        scores = Scores(compound=0.1, pos=0.4, neu=0.4, neg=0.2)
         confidence = self.service._calculate_confidence(scores, "This is okay", "this is okay")
         
         assert confidence >= 0.1
@@ -223,7 +226,7 @@ class TestSentimentService:
     
     def test_calculate_confidence_short_text(self):
         """Test confidence calculation for short text"""
-        scores = {'compound': 0.5, 'pos': 0.6, 'neu': 0.3, 'neg': 0.1}
+        scores = Scores(compound=0.5, pos=0.6, neu=0.3, neg=0.1)
         confidence = self.service._calculate_confidence(scores, "Good", "good")
         
         # Should be reduced due to short text
@@ -232,7 +235,7 @@ class TestSentimentService:
     
     def test_calculate_confidence_processed_text_difference(self):
         """Test confidence calculation when processed text differs significantly"""
-        scores = {'compound': 0.5, 'pos': 0.6, 'neu': 0.3, 'neg': 0.1}
+        scores = Scores(compound=0.5, pos=0.6, neu=0.3, neg=0.1)
         original = "!@#$%^&*() Good product !@#$%^&*()"
         processed = "Good product"
         confidence = self.service._calculate_confidence(scores, original, processed)
@@ -279,6 +282,45 @@ class TestSentimentService:
         mock_cache.get.assert_called_once()
         mock_cache.set.assert_not_called()  # Should not store when cache hit
     
+    @patch('app.services.sentiment_service.get_cache_manager')
+    def test_analyze_sentiment_batch_uses_batched_cache(self, mock_get_cache_manager):
+        """Test that batch analysis does one get_many and one set_many"""
+        mock_cache = Mock()
+        mock_get_cache_manager.return_value = mock_cache
+        texts = [f"This is test number {i}" for i in range(10)]
+        mock_cache.generate_sentiment_keys.return_value = [f"key_{i}" for i in range(10)]
+        mock_cache.get_many.return_value = [None] * 10  # All misses
+        
+        service = SentimentService()
+        results = service.analyze_sentiment_batch(texts)
+        
+        assert len(results) == 10
+        assert all(isinstance(result, SentimentResult) for result in results)
+        mock_cache.get_many.assert_called_once_with([f"key_{i}" for i in range(10)])
+        mock_cache.set_many.assert_called_once()
+        assert len(mock_cache.set_many.call_args[0][0]) == 10
+        mock_cache.get.assert_not_called()
+        mock_cache.set.assert_not_called()
+    
+    @patch('app.services.sentiment_service.get_cache_manager')
+    def test_analyze_sentiment_batch_cache_hits_and_empty(self, mock_get_cache_manager):
+        """Test that batch analysis returns cached results and skips empty texts"""
+        mock_cache = Mock()
+        mock_get_cache_manager.return_value = mock_cache
+        cached_result = SentimentResult('positive', 0.8, {'compound': 0.8})
+        mock_cache.generate_sentiment_keys.return_value = ["key_a", "key_b"]
+        mock_cache.get_many.return_value = [cached_result, cached_result]
+        
+        service = SentimentService()
+        results = service.analyze_sentiment_batch(["Text one here", "", "Text two here"])
+        
+        assert results[0] is cached_result
+        assert results[2] is cached_result
+        assert results[1].fallback_used is True
+        assert "Empty or whitespace-only text" in results[1].warning
+        mock_cache.generate_sentiment_keys.assert_called_once_with(["Text one here", "Text two here"])
+        mock_cache.set_many.assert_not_called()
+    
     def test_handle_special_cases_normal_text(self):
         """Test special case handling for normal text"""
         text = "This is a normal text with good content."
@@ -308,6 +350,54 @@ class TestSentimentService:
         assert "Very short text" in result.warning
 
 
+class TestSentimentServiceIntegration:
+    """Classification tests that run against the real VADER analyzer"""
+    
+    def setup_method(self):
+        """Set up test fixtures"""
+        self.service = SentimentService()
+    
+    def test_analyze_sentiment_positive_text(self):
+        """Test sentiment analysis for positive text"""
+        text = "I love this product! It's amazing and wonderful."
+        result = self.service.analyze_sentiment(text)
+        
+        assert isinstance(result, SentimentResult)
+        assert result.sentiment == 'positive'
+        assert result.confidence > 0.5
+        assert result.scores is not None
+        assert 'compound' in result.scores
+        assert result.fallback_used is False
+        assert result.warning is None
+    
+    def test_analyze_sentiment_negative_text(self):
+        """Test sentiment analysis for negative text"""
+        text = "I hate this product! It's terrible and awful."
+        result = self.service.analyze_sentiment(text)
+        
+        assert result.sentiment == 'negative'
+        assert result.confidence > 0.5
+        assert result.scores['compound'] < 0
+        assert result.fallback_used is False
+    
+    def test_analyze_sentiment_neutral_text(self):
+        """Test sentiment analysis for neutral text"""
+        text = "This is a product. It exists."
+        result = self.service.analyze_sentiment(text)
+        
+        assert result.sentiment == 'normal'
+        assert result.confidence >= 0.1
+        assert abs(result.scores['compound']) <= 0.05
+    
+    def test_service_is_picklable(self):
+        """Test SentimentService survives a pickle round-trip"""
+        restored = pickle.loads(pickle.dumps(self.service))
+        
+        assert restored.cache_manager is not None
+        result = restored.analyze_sentiment("I love this product! It's amazing and wonderful.")
+        assert result.sentiment == 'positive'
+
+
 class TestSentimentResult:
     """Test cases for SentimentResult class"""
     
@@ -330,4 +420,22 @@ class TestSentimentResult:
         assert result.sentiment == 'normal'
         assert result.confidence == 0.1
         assert result.fallback_used is True
-        assert result.warning == "Test warning"
\ No newline at end of file
+        assert result.warning == "Test warning"
+    
+    def test_scores_attribute_and_key_access(self):
+        """Test Scores supports both attribute and dict-style reads"""
+        scores = Scores(compound=0.5, pos=0.6, neu=0.3, neg=0.1)
+        
+        assert scores.compound == 0.5
+        assert scores['compound'] == 0.5
+        assert scores['neg'] == scores.neg
+        assert 'compound' in scores
+        assert 'missing' not in scores
+    
+    @pytest.mark.parametrize("key", ['missing', 'count', '_fields'])
+    def test_scores_unknown_key_raises_key_error(self, key):
+        """Test Scores rejects string keys that are not score fields"""
+        scores = Scores(compound=0.5, pos=0.6, neu=0.3, neg=0.1)
+        
+        with pytest.raises(KeyError):
+            scores[key]
@@ -2,16 +2,24 @@
 Unit tests for StanceService
 """
 import pytest
-from unittest.mock import Mock, patch
+from dataclasses import FrozenInstanceError
+from unittest.mock import patch
 from app.services.stance_service import StanceService, StanceResult
 
 
+@pytest.fixture(scope='module')
+def stance_service():
+    """Single StanceService shared by the module (it holds no per-call state)"""
+    return StanceService()
+
+
 class TestStanceService:
     """Test cases for StanceService"""
     
-    def setup_method(self):
+    @pytest.fixture(autouse=True)
+    def setup_service(self, stance_service):
         """Set up test fixtures"""
-        self.service = StanceService()
+        self.service = stance_service
     
     def test_analyze_stance_supportive(self):
         """Test stance analysis for supportive text"""
@@ -175,6 +183,23 @@ class TestStanceService:
         
         assert len(positions) >= 1  # Should find "Microsoft"
     
+    def test_find_target_mentions_word_boundaries(self):
+        """Test that mentions inside longer words are not reported"""
+        text = "pineapple is good but apple is better. i like apple_pie and apple."
+        positions = self.service._find_target_mentions(text, "apple")
+        
+        assert positions == [22, 60]
+    
+    def test_find_target_mentions_absent_target_skips_scan(self):
+        """Test that a target absent from the text never reaches the scanner"""
+        text = "samsung makes good phones"
+        
+        with patch.object(StanceService, '_scan_target_hits') as scan:
+            positions = self.service._find_target_mentions(text, "microsoft corporation")
+        
+        assert positions == []
+        scan.assert_not_called()
+    
     def test_is_word_boundary_match_valid(self):
         """Test word boundary matching for valid cases"""
         text = "Apple is great"
@@ -215,6 +240,19 @@ class TestStanceService:
         
         assert -0.2 <= sentiment <= 0.2  # Should be neutral
     
+    def test_context_compounds_scores_shared_windows_once(self):
+        """Test that mentions clipping to the same window are scored once"""
+        text = "Apple and apple"
+        positions = [0, 10]
+        
+        with patch.object(self.service.sentiment_analyzer, 'polarity_scores',
+                          wraps=self.service.sentiment_analyzer.polarity_scores) as scorer:
+            compounds = self.service._context_compounds(text, positions)
+        
+        assert scorer.call_count == 1
+        assert compounds[0] == compounds[1]
+        assert self.service._analyze_context_sentiment(text, positions, compounds) == compounds[0]
+    
     def test_analyze_keyword_based_stance_positive(self):
         """Test keyword-based stance analysis for positive stance"""
         text = "I love Apple products they are excellent and amazing"
@@ -247,41 +285,30 @@ class TestStanceService:
         
         assert score < 0  # Should be negative due to negation
     
-    def test_apply_modifiers_intensifier(self):
-        """Test applying intensifier modifiers"""
-        words = ["very", "good", "product"]
-        word_idx = 1  # "good"
-        base_score = 0.5
-        modified_score = self.service._apply_modifiers(words, word_idx, base_score)
-        
-        assert modified_score > base_score  # Should be intensified
-    
-    def test_apply_modifiers_diminisher(self):
-        """Test applying diminisher modifiers"""
-        words = ["somewhat", "good", "product"]
+    @pytest.mark.parametrize("modifier,expected", [
+        ("very", 0.75),       # Intensifier
+        ("somewhat", 0.35),   # Diminisher
+    ])
+    def test_apply_modifiers(self, modifier, expected):
+        """Test applying intensifier and diminisher modifiers"""
+        words = [modifier, "good", "product"]
         word_idx = 1  # "good"
         base_score = 0.5
         modified_score = self.service._apply_modifiers(words, word_idx, base_score)
         
-        assert modified_score < base_score  # Should be diminished
+        assert modified_score == pytest.approx(expected)
     
-    def test_apply_negation_positive_to_negative(self):
-        """Test applying negation to flip positive to negative"""
-        words = ["not", "good", "product"]
-        word_idx = 1  # "good"
-        base_score = 0.5
-        negated_score = self.service._apply_negation(words, word_idx, base_score)
-        
-        assert negated_score == -base_score  # Should be flipped
-    
-    def test_apply_negation_no_negation(self):
-        """Test applying negation when no negation words present"""
-        words = ["very", "good", "product"]
+    @pytest.mark.parametrize("words,expected", [
+        (["not", "good", "product"], -0.5),   # Negation flips the stance
+        (["very", "good", "product"], 0.5),   # No negation, unchanged
+    ])
+    def test_apply_negation(self, words, expected):
+        """Test applying negation to the score of a stance word"""
         word_idx = 1  # "good"
         base_score = 0.5
         score = self.service._apply_negation(words, word_idx, base_score)
         
-        assert score == base_score  # Should remain unchanged
+        assert score == expected
     
     def test_combine_stance_signals_agreeing(self):
         """Test combining stance signals when they agree"""
@@ -308,6 +335,14 @@ class TestStanceService:
         
         assert consistency == 1.0  # Single mention is always consistent
     
+    def test_check_stance_consistency_single_mention_skips_scoring(self):
+        """Test that a single mention never scores any context window"""
+        with patch.object(StanceService, '_context_compounds') as compounds:
+            consistency = self.service._check_stance_consistency("Apple is great", [0])
+        
+        assert consistency == 1.0
+        compounds.assert_not_called()
+    
     def test_check_stance_consistency_consistent_mentions(self):
         """Test stance consistency check for consistent mentions"""
         text = "Apple is great. Apple is amazing. Apple is wonderful."
@@ -316,23 +351,14 @@ class TestStanceService:
         
         assert consistency > 0.7  # Should be highly consistent
     
-    def test_classify_stance_supportive(self):
-        """Test stance classification for supportive score"""
-        score = 0.5
-        stance = self.service._classify_stance(score)
-        assert stance == 'supportive'
-    
-    def test_classify_stance_opposing(self):
-        """Test stance classification for opposing score"""
-        score = -0.5
-        stance = self.service._classify_stance(score)
-        assert stance == 'opposing'
-    
-    def test_classify_stance_neutral(self):
-        """Test stance classification for neutral score"""
-        score = 0.05
-        stance = self.service._classify_stance(score)
-        assert stance == 'neutral'
+    @pytest.mark.parametrize("score,expected", [
+        (0.5, 'supportive'),
+        (-0.5, 'opposing'),
+        (0.05, 'neutral'),
+    ])
+    def test_classify_stance(self, score, expected):
+        """Test stance classification of combined scores"""
+        assert self.service._classify_stance(score) == expected
     
     def test_calculate_confidence_high_score(self):
         """Test confidence calculation for high combined score"""
@@ -345,13 +371,13 @@ class TestStanceService:
         assert confidence > 0.7
         assert confidence <= 1.0
     
-    def test_calculate_confidence_low_score(self):
-        """Test confidence calculation for low combined score"""
-        combined_score = 0.1
-        mention_count = 1
-        text = "This is a test"
-        target = "test"
-        confidence = self.service._calculate_confidence(combined_score, mention_count, text, target)
+    @pytest.mark.parametrize("combined_score,text,target", [
+        (0.1, "This is a test", "test"),   # Low combined score
+        (0.5, "Good", "Good"),             # Short text
+    ])
+    def test_calculate_confidence_low(self, combined_score, text, target):
+        """Test confidence stays low for weak scores or very short text"""
+        confidence = self.service._calculate_confidence(combined_score, 1, text, target)
         
         assert confidence >= 0.1
         assert confidence < 0.5
@@ -378,18 +404,6 @@ class TestStanceService:
         
         assert confidence == 0.1  # Should return minimum confidence
     
-    def test_calculate_confidence_short_text(self):
-        """Test confidence calculation for short text"""
-        combined_score = 0.5
-        mention_count = 1
-        text = "Good"
-        target = "Good"
-        confidence = self.service._calculate_confidence(combined_score, mention_count, text, target)
-        
-        # Should be reduced due to short text
-        assert confidence >= 0.1
-        assert confidence < 0.5
-    
     def test_calculate_confidence_long_text(self):
         """Test confidence calculation for long text"""
         combined_score = 0.5
@@ -425,6 +439,16 @@ class TestStanceService:
         # Should be boosted due to very clear stance
         assert confidence > 0.8
     
+    def test_calculate_confidence_from_stats_matches_text_form(self):
+        """Test that the stats-based confidence matches the text-based shim"""
+        text = "Microsoft Corporation is a good company"
+        target = "Microsoft Corporation"
+        stats = self.service._compute_text_stats(text, target)
+        
+        assert (stats.n_words, stats.n_target_words) == (6, 2)
+        assert self.service._calculate_confidence_from_stats(0.5, 2, stats, 0.9) == \
+            self.service._calculate_confidence(0.5, 2, text, target, 0.9)
+    
     def test_calculate_confidence_with_consistency(self):
         """Test confidence calculation with consistency factor"""
         combined_score = 0.5
@@ -438,13 +462,42 @@ class TestStanceService:
         assert confidence >= 0.1
         assert confidence <= 1.0
     
-    @patch('app.utils.cache_manager.get_cache_manager')
-    def test_analyze_stance_uses_cache(self, mock_cache_manager):
+    def test_analyze_stance_computes_on_cache_miss(self):
+        """Test that every cache manager miss runs this service's pipeline"""
+        text = "Apple keeps making reliable laptops"
+        
+        with patch.object(self.service, 'cache_manager') as mock_cache, \
+                patch.object(StanceService, '_compute_stance', wraps=self.service._compute_stance) as mock_compute:
+            mock_cache.get.return_value = None
+            first = self.service.analyze_stance(text, "Apple")
+            second = self.service.analyze_stance(text, "Apple")
+        
+        assert first == second
+        assert mock_compute.call_count == 2
+        assert mock_cache.set.call_count == 2
+
+
+@pytest.fixture(scope='class')
+def cache_manager_mock():
+    """Patch the stance service's cache manager factory once per class"""
+    with patch('app.services.stance_service.get_cache_manager') as mock_get_cache_manager:
+        yield mock_get_cache_manager
+
+
+class TestStanceServiceCaching:
+    """Test cases for StanceService cache integration"""
+    
+    @pytest.fixture(autouse=True)
+    def mock_cache(self, cache_manager_mock):
+        """Fresh cache mock state for each test"""
+        mock_cache = cache_manager_mock.return_value
+        mock_cache.reset_mock()
+        mock_cache.generate_stance_key.return_value = "test_key"
+        return mock_cache
+    
+    def test_analyze_stance_uses_cache(self, mock_cache):
         """Test that stance analysis uses caching"""
-        mock_cache = Mock()
-        mock_cache_manager.return_value = mock_cache
         mock_cache.get.return_value = None  # Cache miss
-        mock_cache.generate_stance_key.return_value = "test_key"
         
         service = StanceService()
         text = "Apple is great"
@@ -456,16 +509,11 @@ class TestStanceService:
         mock_cache.set.assert_called_once()
         mock_cache.generate_stance_key.assert_called_once_with(text, target)
     
-    @patch('app.utils.cache_manager.get_cache_manager')
-    def test_analyze_stance_cache_hit(self, mock_cache_manager):
+    def test_analyze_stance_cache_hit(self, mock_cache):
         """Test that stance analysis returns cached result"""
-        mock_cache = Mock()
-        mock_cache_manager.return_value = mock_cache
-        
         # Mock cached result
         cached_result = StanceResult('supportive', 0.8, 'Apple')
         mock_cache.get.return_value = cached_result
-        mock_cache.generate_stance_key.return_value = "test_key"
         
         service = StanceService()
         text = "Apple is great"
@@ -516,4 +564,24 @@ class TestStanceResult:
         assert result.combined_score == -0.6
         assert result.consistency == 0.9
         assert result.fallback_used is True
-        assert result.warning == "Test warning"
\ No newline at end of file
+        assert result.warning == "Test warning"
+    
+    def test_stance_result_is_immutable(self):
+        """Test that StanceResult fields cannot be reassigned"""
+        result = StanceResult('supportive', 0.8, 'Apple')
+        
+        with pytest.raises(FrozenInstanceError):
+            result.stance = 'opposing'
+        
+        assert result == StanceResult('supportive', 0.8, 'Apple')
+    
+    def test_stance_result_equality_includes_metadata(self):
+        """Test that a fallback result never equals a real analysis"""
+        result = StanceResult('supportive', 0.8, 'Apple', target_mentions=1)
+        fallback = StanceResult('supportive', 0.8, 'Apple', target_mentions=1,
+                                fallback_used=True, warning="Test warning")
+        
+        assert result == StanceResult('supportive', 0.8, 'Apple', target_mentions=1)
+        assert hash(result) == hash(StanceResult('supportive', 0.8, 'Apple', target_mentions=1))
+        assert result != fallback
+        assert result != StanceResult('supportive', 0.8, 'Apple', target_mentions=2)
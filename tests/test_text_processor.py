@@ -3,7 +3,16 @@ Unit tests for TextProcessor
 """
 import pytest
 from unittest.mock import patch
-from app.utils.text_processor import TextProcessor
+from langdetect.lang_detect_exception import ErrorCode, LangDetectException
+from app.utils.text_processor import TextProcessor, _detect_is_english_cached
+
+
+@pytest.fixture(autouse=True)
+def clear_detection_cache():
+    """Keep memoised language verdicts (possibly from a patched detector) per test"""
+    _detect_is_english_cached.cache_clear()
+    yield
+    _detect_is_english_cached.cache_clear()
 
 
 class TestTextProcessor:
@@ -49,6 +58,42 @@ class TestTextProcessor:
         result = self.processor.is_english_text(text)
         assert isinstance(result, bool)
     
+    @patch('app.utils.text_processor.detect', return_value='en')
+    def test_is_english_text_caches_detection(self, mock_detect):
+        """Test that repeated texts reuse the cached detection result"""
+        text = "Repeated payload used to check language detection caching"
+        
+        assert self.processor.is_english_text(text) is True
+        assert TextProcessor().is_english_text(text) is True
+        mock_detect.assert_called_once()
+    
+    @patch('app.utils.text_processor.detect')
+    def test_is_english_text_undetectable_falls_back(self, mock_detect):
+        """Test that a langdetect failure falls back to the short-text heuristic"""
+        mock_detect.side_effect = LangDetectException(ErrorCode.CantDetectError, "No features in text.")
+        text = "Über the café and the bar"
+        
+        assert self.processor.is_english_text(text) == self.processor._is_likely_english_short_text(
+            self.processor._remove_noise_for_detection(text)
+        )
+        mock_detect.assert_called_once()
+    
+    @patch('app.utils.text_processor.detect')
+    def test_is_english_text_clear_cases_skip_detection(self, mock_detect):
+        """Test that clear-cut scripts are decided without langdetect"""
+        assert self.processor.is_english_text("هذا نص باللغة العربية للاختبار") is False
+        assert self.processor.is_english_text("This is what we say to you and me") is True
+        mock_detect.assert_not_called()
+    
+    @pytest.mark.parametrize("text", [
+        "Yo voy a la playa a ver a mi amigo",
+        "Vou a praia a pe e a casa do meu pai",
+    ])
+    def test_is_english_text_latin_script_non_english(self, text):
+        """Test that words shared with other languages do not settle detection"""
+        assert self.processor._has_distinctive_english_words(text) is False
+        assert self.processor.is_english_text(text) is False
+    
     def test_is_likely_english_short_text_english_words(self):
         """Test short text English detection with common English words"""
         text = "the quick brown fox"
@@ -108,6 +153,35 @@ class TestTextProcessor:
         assert "awesome" in cleaned
         assert "great" in cleaned
     
+    def test_clean_text_handle_with_email_domain(self):
+        """Test that an email-shaped handle is removed before mention matching"""
+        text = "Follow @user@mastodon.social for #updates"
+        cleaned = self.processor.clean_text(text)
+        
+        assert cleaned == "follow for updates"
+    
+    def test_clean_text_email_followed_by_url(self):
+        """Test that URLs are removed before an adjoining email address"""
+        assert self.processor.clean_text("me@ex.comhttps://t.co/x") == ""
+    
+    def test_clean_text_batch_matches_clean_text(self):
+        """Test that batch cleaning matches cleaning each text on its own"""
+        texts = [
+            "Check https://example.com @user #Python is GREAT!!!",
+            "",
+            "I can't email test@example.com",
+            "مرحبا @user #وسم",
+        ]
+        
+        for preserve_case in (False, True):
+            expected = [self.processor.clean_text(t, preserve_case=preserve_case) for t in texts]
+            assert self.processor.clean_text_batch(texts, preserve_case=preserve_case) == expected
+    
+    def test_clean_text_dotted_capital_i_contraction(self):
+        """Test that contractions are expanded before non-ASCII lowercasing"""
+        assert self.processor.clean_text("İ'Very") == "i havery"
+        assert self.processor.clean_text("İ'M happy, é") == "i am happy, é"
+    
     def test_clean_text_contractions(self):
         """Test text cleaning with contractions"""
         text = "I can't believe it's so good!"